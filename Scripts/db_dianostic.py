@@ -3,28 +3,118 @@ Database Connection Diagnostics Script for Horus Bridge Server
 Run this script to diagnose PostgreSQL connection issues
 """
 
+import argparse
+import atexit
+import contextlib
+import importlib.util
 import socket
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+import selectors
 import sys
 import traceback
 from datetime import datetime
 
+from diagnostic_helpers import buffered_output, resolve_host, use_utf8_stdout
+
+# Pool for the first connection string that authenticates, shared by every later step
+_pool = None
+_pool_key = None
+_pool_conn_str = None
+
+# Result of DIAGNOSTICS_QUERY for the pooled connection
+_diagnostics = None
+
+HORUS_TABLES = ['recordings', 'frames']
+
+# Everything the auth and permission steps report, fetched in one round-trip
+DIAGNOSTICS_QUERY = """
+    SELECT jsonb_build_object(
+        'version', version(),
+        'readable_tables', (
+            SELECT count(*) FROM (
+                SELECT 1 FROM information_schema.tables WHERE table_schema = 'public' LIMIT 5
+            ) t
+        ),
+        'horus_tables', (
+            SELECT coalesce(jsonb_object_agg(
+                c.relname, jsonb_build_array(c.reltuples::bigint, has_table_privilege(c.oid, 'SELECT'))
+            ), '{}'::jsonb)
+            FROM pg_class c JOIN pg_namespace ns ON ns.oid = c.relnamespace
+            WHERE ns.nspname = 'public' AND c.relname = ANY(%s)
+        )
+    )
+"""
+
+def fetch_diagnostics(conn):
+    """Run DIAGNOSTICS_QUERY on conn and return the decoded result"""
+    cursor = conn.cursor()
+    cursor.execute(DIAGNOSTICS_QUERY, (HORUS_TABLES,))
+    result = cursor.fetchone()[0]
+    cursor.close()
+    return result
+
+def init_pool(key, conn_params):
+    """Create the shared pool for conn_params; raises psycopg2.Error if it cannot authenticate"""
+    global _pool, _pool_key, _pool_conn_str
+    close_pool()
+    
+    # minconn=1 opens the first connection right away, so a failed login surfaces here
+    _pool = psycopg2.pool.ThreadedConnectionPool(1, 4, connect_timeout=10, **conn_params)
+    _pool_key = key
+    _pool_conn_str = psycopg2.extensions.make_dsn(**conn_params)
+
+def close_pool():
+    """Close every pooled connection"""
+    global _pool, _pool_key, _pool_conn_str, _diagnostics
+    if _pool is not None:
+        _pool.closeall()
+    _pool = None
+    _pool_key = None
+    _pool_conn_str = None
+    _diagnostics = None
+
+@contextlib.contextmanager
+def get_conn():
+    """Borrow a read-only autocommit connection from the shared pool"""
+    conn = _pool.getconn()
+    try:
+        # Diagnostics only read, so skip transaction bookkeeping
+        if not conn.autocommit:
+            conn.set_session(readonly=True, autocommit=True)
+        yield conn
+    finally:
+        _pool.putconn(conn)
+
+atexit.register(close_pool)
+
+def tune_probe_socket(sock):
+    """Disable Nagle and enable aggressive keepalive so a dead peer is noticed quickly"""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    
+    # Linux-only knobs
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 5)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 2)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 2)
+    if hasattr(socket, "TCP_USER_TIMEOUT"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT, 3000)
+
 def test_network_connectivity(host, port):
     """Test basic network connectivity to the database server"""
     print(f"\n1. Testing network connectivity to {host}:{port}")
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(10)
-        result = sock.connect_ex((host, int(port)))
-        sock.close()
+        with socket.create_connection((host, int(port)), timeout=10):
+            pass
         
-        if result == 0:
-            print("   ✓ Network connectivity: SUCCESS")
-            return True
-        else:
-            print("   ✗ Network connectivity: FAILED")
-            print(f"     Error code: {result}")
-            return False
+        print("   ✓ Network connectivity: SUCCESS")
+        return True
+    except OSError as e:
+        print("   ✗ Network connectivity: FAILED")
+        print(f"     Error code: {e.errno if e.errno is not None else e}")
+        return False
     except Exception as e:
         print(f"   ✗ Network connectivity test failed: {e}")
         return False
@@ -33,17 +123,20 @@ def test_postgresql_service(host, port):
     """Test if PostgreSQL service is responding"""
     print(f"\n2. Testing PostgreSQL service response on {host}:{port}")
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(5)
-        sock.connect((host, int(port)))
-        
-        # Send a basic PostgreSQL startup message to test if it's really PostgreSQL
-        startup_msg = b'\x00\x00\x00\x08\x04\xd2\x16\x2f'
-        sock.send(startup_msg)
-        
-        # Try to receive response
-        response = sock.recv(1024)
-        sock.close()
+        with socket.create_connection((host, int(port)), timeout=5) as sock:
+            # Ship the 8-byte startup packet without waiting on Nagle
+            tune_probe_socket(sock)
+            
+            # Send a basic PostgreSQL startup message to test if it's really PostgreSQL
+            startup_msg = b'\x00\x00\x00\x08\x04\xd2\x16\x2f'
+            sock.send(startup_msg)
+            
+            # Wait for the reply without blocking in recv; the server answers the
+            # SSLRequest with a single 'S' or 'N' byte, so that is all we read
+            sock.setblocking(False)
+            with selectors.DefaultSelector() as sel:
+                sel.register(sock, selectors.EVENT_READ)
+                response = sock.recv(1) if sel.select(timeout=5.0) else b''
         
         if response:
             print("   ✓ PostgreSQL service: RESPONDING")
@@ -57,39 +150,50 @@ def test_postgresql_service(host, port):
         return False
 
 def test_database_connection_methods(host, port, database, user, password):
-    """Test different database connection methods"""
+    """Test different database connection methods, pooling the first one that works"""
+    global _diagnostics
     print(f"\n3. Testing database authentication for user '{user}' on database '{database}'")
     
+    key = (host, str(port), database, user)
+    if _pool is not None and _pool_key == key:
+        try:
+            with get_conn() as conn:
+                _diagnostics = fetch_diagnostics(conn)
+            print("   ✓ Reusing already authenticated connection pool")
+            return _pool_conn_str, True
+        except psycopg2.Error:
+            close_pool()
+    
+    # Keyword parameters go straight to libpq with no quoting to get wrong; the
+    # string forms are only tried if they fail
     connection_methods = [
         {
-            "name": "Standard Connection String",
-            "conn_str": f"host={host} port={port} dbname={database} user={user} password={password}"
+            "name": "Keyword Parameters",
+            "params": dict(host=host, port=int(port), dbname=database, user=user, password=password)
         },
         {
             "name": "Quoted Connection String", 
-            "conn_str": f"host='{host}' port='{port}' dbname='{database}' user='{user}' password='{password}'"
+            "params": {"dsn": f"host='{host}' port='{port}' dbname='{database}' user='{user}' password='{password}'"}
         },
         {
             "name": "URI Format",
-            "conn_str": f"postgresql://{user}:{password}@{host}:{port}/{database}"
+            "params": {"dsn": f"postgresql://{user}:{password}@{host}:{port}/{database}"}
         }
     ]
     
     for i, method in enumerate(connection_methods):
         print(f"\n   Method {i+1}: {method['name']}")
         try:
-            # Test connection with short timeout
-            conn = psycopg2.connect(method['conn_str'], connect_timeout=10)
+            # Test connection with short timeout; the pool keeps it open for the later steps
+            init_pool(key, method['params'])
             
-            # Test basic query
-            cursor = conn.cursor()
-            cursor.execute("SELECT version()")
-            version = cursor.fetchone()[0]
-            cursor.close()
-            conn.close()
+            # Test basic query; it also collects what the permission step reports
+            with get_conn() as conn:
+                _diagnostics = fetch_diagnostics(conn)
+            version = _diagnostics['version']
             
             print(f"   ✓ SUCCESS - Connected to: {version[:60]}...")
-            return method['conn_str'], True
+            return _pool_conn_str, True
             
         except psycopg2.OperationalError as op_ex:
             print(f"   ✗ FAILED - Operational Error: {op_ex}")
@@ -102,35 +206,38 @@ def test_database_connection_methods(host, port, database, user, password):
     
     return None, False
 
-def test_database_permissions(conn_str):
-    """Test database permissions"""
+def test_database_permissions():
+    """Test database permissions using the pooled connection"""
     print(f"\n4. Testing database permissions")
     try:
-        conn = psycopg2.connect(conn_str, connect_timeout=10)
-        cursor = conn.cursor()
+        # The auth step normally fetched this already in its single query
+        diagnostics = _diagnostics
+        if diagnostics is None:
+            with get_conn() as conn:
+                diagnostics = fetch_diagnostics(conn)
+        
+        table_stats = diagnostics['horus_tables']
+        available_tables = []
         
         # Test basic read permissions
         print("   Testing SELECT permissions...")
-        cursor.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public' LIMIT 5")
-        tables = cursor.fetchall()
-        print(f"   ✓ Can read {len(tables)} tables")
+        print(f"   ✓ Can read {diagnostics['readable_tables']} tables")
         
         # Test specific Horus tables
         print("   Testing Horus tables access...")
-        horus_tables = ['recordings', 'frames']
-        available_tables = []
-        
-        for table in horus_tables:
-            try:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                count = cursor.fetchone()[0]
-                available_tables.append(table)
-                print(f"   ✓ Table '{table}': {count} rows")
-            except psycopg2.Error as e:
-                print(f"   ✗ Table '{table}': Not accessible - {e}")
         
-        cursor.close()
-        conn.close()
+        for table in HORUS_TABLES:
+            if table not in table_stats:
+                print(f"   ✗ Table '{table}': Not accessible - table not found")
+                continue
+            
+            estimate, can_select = table_stats[table]
+            if not can_select:
+                print(f"   ✗ Table '{table}': Not accessible - no SELECT privilege")
+                continue
+            
+            available_tables.append(table)
+            print(f"   ✓ Table '{table}': ~{max(estimate, 0)} rows (estimate)")
         
         print(f"   Available Horus tables: {available_tables}")
         return len(available_tables) > 0
@@ -154,15 +261,15 @@ def check_environment():
         print("   ✗ psycopg2 not available")
         return False
     
-    # Check if we're in ArcGIS Pro environment
-    try:
-        import arcpy
+    # Check if we're in ArcGIS Pro environment; find_spec avoids the multi-second arcpy import
+    if importlib.util.find_spec("arcpy") is not None:
         print("   ✓ Running in ArcGIS Pro Python environment")
-    except ImportError:
+    else:
         print("   ⚠ Not running in ArcGIS Pro environment (may be OK)")
     
     return True
 
+@buffered_output
 def generate_troubleshooting_report(host, port, database, user, successful_conn_str=None):
     """Generate a troubleshooting report"""
     print("\n" + "="*60)
@@ -171,7 +278,10 @@ def generate_troubleshooting_report(host, port, database, user, successful_conn_
     
     if successful_conn_str:
         print(f"✓ GOOD NEWS: Database connection successful!")
-        print(f"  Working connection string: {successful_conn_str.replace(user, 'USER').replace('password=', 'password=***')}")
+        # Rebuilt from its parts so the password itself never reaches the report
+        params = psycopg2.extensions.parse_dsn(successful_conn_str)
+        params.update(user='USER', password='***')
+        print(f"  Working connection string: {psycopg2.extensions.make_dsn(**params)}")
         print("\n  SOLUTION: Update your Python bridge server to use this connection method.")
         
     else:
@@ -199,8 +309,43 @@ def generate_troubleshooting_report(host, port, database, user, successful_conn_
         print("   - Check if SSL is required (add sslmode=require)")
         print("   - Verify database name spelling")
 
+def run_database_checks(host, port, database, user, password):
+    """Run the network, service, authentication and permission checks in order, returning the working connection string or None"""
+    successful_conn_str = None
+    host_ip = resolve_host(host)
+    network_ok = test_network_connectivity(host_ip, port)
+    
+    if network_ok:
+        postgresql_ok = test_postgresql_service(host_ip, port)
+        
+        if postgresql_ok:
+            successful_conn_str, auth_ok = test_database_connection_methods(host, port, database, user, password)
+            
+            if auth_ok:
+                permissions_ok = test_database_permissions()
+                
+                if permissions_ok:
+                    print("\n✓ ALL TESTS PASSED - Database should work with your bridge server!")
+                else:
+                    print("\n⚠ Connection works but permissions may be limited")
+            
+        else:
+            print("\n✗ PostgreSQL service not responding - check server configuration")
+    else:
+        print("\n✗ Network connectivity failed - check network and firewall settings")
+    
+    return successful_conn_str
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='PostgreSQL Connection Diagnostics for Horus Bridge Server')
+    parser.add_argument('--check-env', action='store_true', help='Also check the Python environment and ArcGIS Pro modules')
+    return parser.parse_args()
+
 def main():
     """Main diagnostic routine"""
+    args = parse_arguments()
+    
     print("PostgreSQL Connection Diagnostics for Horus Bridge Server")
     print(f"Timestamp: {datetime.now().isoformat()}")
     print("="*60)
@@ -222,36 +367,17 @@ def main():
     print(f"  Database: {database}")
     print(f"  User: {user}")
     
-    # Run diagnostic steps
-    network_ok = test_network_connectivity(host, port)
-    
-    if network_ok:
-        postgresql_ok = test_postgresql_service(host, port)
-        
-        if postgresql_ok:
-            successful_conn_str, auth_ok = test_database_connection_methods(host, port, database, user, password)
-            
-            if auth_ok:
-                permissions_ok = test_database_permissions(successful_conn_str)
-                
-                if permissions_ok:
-                    print("\n✓ ALL TESTS PASSED - Database should work with your bridge server!")
-                else:
-                    print("\n⚠ Connection works but permissions may be limited")
-            
-        else:
-            print("\n✗ PostgreSQL service not responding - check server configuration")
-    else:
-        print("\n✗ Network connectivity failed - check network and firewall settings")
+    successful_conn_str = run_database_checks(host, port, database, user, password)
     
     # Check environment
-    env_ok = check_environment()
+    if args.check_env:
+        env_ok = check_environment()
     
     # Generate report
-    successful_conn_str = None  # You'd get this from test_database_connection_methods if successful
     generate_troubleshooting_report(host, port, database, user, successful_conn_str)
 
 if __name__ == "__main__":
+    use_utf8_stdout()
     try:
         main()
     except KeyboardInterrupt:
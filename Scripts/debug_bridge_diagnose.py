@@ -3,31 +3,69 @@ Horus Media Server Connectivity Diagnostic Script
 Run this to diagnose why image retrieval is failing with WinError 10061
 """
 
+import argparse
+import asyncio
+import functools
+import http.client
+import importlib.util
 import socket
+import urllib.parse
 import urllib.request
 import urllib.error
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from diagnostic_helpers import buffered_output, resolve_host, use_utf8_stdout
+
+# Shared by every probe instead of building a new dict per request
+_UA_HEADERS = {'User-Agent': 'HorusConnectivityTest/1.0'}
+_ALT_UA_HEADERS = {'User-Agent': 'HorusTest/1.0'}
+
+# (host, port) -> (reachable, error); the first probe of a port answers for the whole run
+_tcp_results = {}
+
+def tcp_reachable(host, port, timeout=2.0):
+    """Return (reachable, error) for host:port, probing each pair at most once per run"""
+    key = (host, port)
+    if key not in _tcp_results:
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                pass
+            _tcp_results[key] = (True, None)
+        except Exception as e:
+            _tcp_results[key] = (False, e)
+    return _tcp_results[key]
+
+async def tcp_reachable_async(host, port, timeout=2.0):
+    """Async counterpart of tcp_reachable, sharing the same per-run results"""
+    key = (host, port)
+    if key not in _tcp_results:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            writer.close()
+            _tcp_results[key] = (True, None)
+        except asyncio.TimeoutError:
+            _tcp_results[key] = (False, socket.timeout("timed out"))
+        except Exception as e:
+            _tcp_results[key] = (False, e)
+    return _tcp_results[key]
+
 def test_basic_connectivity(host, port, timeout=10):
     """Test basic TCP connectivity"""
     print(f"\n1. Testing TCP connectivity to {host}:{port}")
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((host, port))
-        sock.close()
-        
-        if result == 0:
-            print(f"   ✓ TCP connection: SUCCESS")
-            return True
-        else:
-            print(f"   ✗ TCP connection: FAILED (error code: {result})")
-            print(f"     This means the server is not accepting connections on port {port}")
-            return False
-    except Exception as e:
-        print(f"   ✗ TCP test failed: {e}")
+    reachable, error = tcp_reachable(host, port, timeout)
+    
+    if reachable:
+        print(f"   ✓ TCP connection: SUCCESS")
+        return True
+    elif isinstance(error, OSError):
+        print(f"   ✗ TCP connection: FAILED (error code: {error.errno if error.errno is not None else error})")
+        print(f"     This means the server is not accepting connections on port {port}")
+        return False
+    else:
+        print(f"   ✗ TCP test failed: {error}")
         return False
 
 def test_http_service(base_url, timeout=10):
@@ -41,37 +79,49 @@ def test_http_service(base_url, timeout=10):
         "api/",       # API
     ]
     
-    working_endpoints = []
+    # Normalize the URLs once, outside the probe loop
+    base = base_url.rstrip('/')
+    targets = [(endpoint, f"{base}/{endpoint}".rstrip('/')) for endpoint in test_endpoints]
     
-    for endpoint in test_endpoints:
-        test_url = f"{base_url.rstrip('/')}/{endpoint}".rstrip('/')
-        print(f"   Testing: {test_url}")
-        
+    def probe(target):
+        """Probe a single endpoint, returning (endpoint, url, status, error)"""
+        endpoint, test_url = target
         try:
-            req = urllib.request.Request(test_url, headers={
-                'User-Agent': 'HorusConnectivityTest/1.0'
-            })
+            req = urllib.request.Request(test_url, headers=_UA_HEADERS)
             
             with urllib.request.urlopen(req, timeout=timeout) as response:
-                status = response.status
-                if status in [200, 301, 302]:
-                    print(f"     ✓ Status {status}: Available")
-                    working_endpoints.append(endpoint)
-                else:
-                    print(f"     ⚠ Status {status}: Responded but with error")
-                    
-        except urllib.error.HTTPError as he:
-            if he.code in [401, 403, 404]:
-                print(f"     ⚠ Status {he.code}: Server responding (auth/not found)")
+                return endpoint, test_url, response.status, None
+        except Exception as e:
+            return endpoint, test_url, None, e
+    
+    # Overlap the round-trips; total time is the slowest endpoint, not the sum
+    with ThreadPoolExecutor(max_workers=len(test_endpoints)) as executor:
+        results = list(executor.map(probe, targets))
+    
+    working_endpoints = []
+    
+    for endpoint, test_url, status, error in results:
+        print(f"   Testing: {test_url}")
+        
+        if error is None:
+            if status in [200, 301, 302]:
+                print(f"     ✓ Status {status}: Available")
                 working_endpoints.append(endpoint)
             else:
-                print(f"     ✗ HTTP Error {he.code}: {he.reason}")
+                print(f"     ⚠ Status {status}: Responded but with error")
                 
-        except urllib.error.URLError as ue:
-            print(f"     ✗ URL Error: {ue.reason}")
+        elif isinstance(error, urllib.error.HTTPError):
+            if error.code in [401, 403, 404]:
+                print(f"     ⚠ Status {error.code}: Server responding (auth/not found)")
+                working_endpoints.append(endpoint)
+            else:
+                print(f"     ✗ HTTP Error {error.code}: {error.reason}")
+                
+        elif isinstance(error, urllib.error.URLError):
+            print(f"     ✗ URL Error: {error.reason}")
             
-        except Exception as e:
-            print(f"     ✗ Request failed: {e}")
+        else:
+            print(f"     ✗ Request failed: {error}")
     
     return working_endpoints
 
@@ -87,9 +137,7 @@ def test_horus_image_endpoint(base_url, timeout=15):
     print(f"   Testing exact failing URL: {test_url}")
     
     try:
-        req = urllib.request.Request(test_url, headers={
-            'User-Agent': 'HorusConnectivityTest/1.0'
-        })
+        req = urllib.request.Request(test_url, headers=_UA_HEADERS)
         
         with urllib.request.urlopen(req, timeout=timeout) as response:
             print(f"   ✓ SUCCESS: Status {response.status}")
@@ -115,6 +163,29 @@ def test_horus_image_endpoint(base_url, timeout=15):
         print(f"   ✗ Request failed: {e}")
         return False
 
+@functools.lru_cache(maxsize=32)
+def head_probe(scheme, host, port, paths, timeout=5):
+    """HEAD each path over one keep-alive connection, returning {path: (status, error)}"""
+    connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    conn = connection_class(host, port, timeout=timeout)
+    results = {}
+    
+    try:
+        for path in paths:
+            try:
+                conn.request("HEAD", path, headers=_ALT_UA_HEADERS)
+                response = conn.getresponse()
+                response.read()
+                results[path] = (response.status, None)
+            except Exception as e:
+                results[path] = (None, e)
+                # Drop the broken socket; the next request reconnects
+                conn.close()
+    finally:
+        conn.close()
+    
+    return results
+
 def test_alternative_urls():
     """Test alternative URL configurations"""
     print(f"\n4. Testing alternative URL configurations")
@@ -129,46 +200,112 @@ def test_alternative_urls():
         "http://127.0.0.1:5050/web/",     # Try loopback
     ]
     
+    # Group the URLs by (scheme, host, port) so each server gets one connection
+    targets = {}
+    hosts = {}
+    for config in base_configs:
+        parts = urllib.parse.urlsplit(config)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        server = (parts.scheme, parts.hostname, port)
+        targets[config] = (server, parts.path or "/")
+        hosts.setdefault(server, {})[parts.path or "/"] = None
+    
+    def probe(server):
+        """Probe every path on one server, returning (server, results)"""
+        scheme, host, port = server
+        paths = tuple(hosts[server])
+        
+        # Skip the HTTP timeout entirely when nothing is listening
+        reachable, error = tcp_reachable(host, port)
+        if not reachable:
+            return server, {path: (None, error) for path in paths}
+        
+        return server, head_probe(scheme, host, port, paths)
+    
+    # Servers are probed side by side; paths on the same server share a socket
+    with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+        results = dict(executor.map(probe, hosts))
+    
     working_configs = []
     
     for config in base_configs:
+        server, path = targets[config]
+        status, error = results[server][path]
         print(f"   Testing: {config}")
-        try:
-            req = urllib.request.Request(config, headers={'User-Agent': 'HorusTest/1.0'})
-            with urllib.request.urlopen(req, timeout=5) as response:
-                if response.status in [200, 301, 302]:
-                    print(f"     ✓ Working: Status {response.status}")
-                    working_configs.append(config)
-                else:
-                    print(f"     ⚠ Status {response.status}")
-        except Exception as e:
-            print(f"     ✗ Failed: {str(e)[:50]}...")
+        if error is not None:
+            print(f"     ✗ Failed: {str(error)[:50]}...")
+        elif status in [200, 301, 302]:
+            print(f"     ✓ Working: Status {status}")
+            working_configs.append(config)
+        else:
+            print(f"     ⚠ Status {status}")
     
     return working_configs
 
-def check_local_services():
+def syn_scan(host, ports, timeout=2):
+    """Classify ports with a raw SYN scan, returning {port: (reachable, error)} for the ports that answered
+    
+    Returns None when scapy is missing or raw sockets need admin/root rights,
+    in which case callers fall back to full TCP connects.
+    """
+    try:
+        from scapy.all import IP, TCP, sr
+    except ImportError:
+        return None
+    
+    try:
+        answered, _ = sr([IP(dst=host) / TCP(dport=port, flags="S") for port in ports], timeout=timeout, verbose=0)
+    except (PermissionError, OSError):
+        return None
+    
+    # Only SYN-ACK and RST settle a port. Silence can mean a firewall, but raw sockets
+    # also get no replies from loopback or the host itself, and a reply can be lost,
+    # so unanswered ports are left for the connect scan
+    results = {}
+    for sent, received in answered:
+        if not received.haslayer(TCP):
+            continue
+        flags = int(received[TCP].flags)
+        if flags & 0x12 == 0x12:  # SYN-ACK
+            results[sent[TCP].dport] = (True, None)
+        elif flags & 0x04:  # RST
+            results[sent[TCP].dport] = (False, ConnectionRefusedError("connection refused"))
+    
+    return results
+
+def check_local_services(host="10.0.10.100", use_syn_scan=False):
     """Check what services are running locally"""
     print(f"\n5. Checking local services")
     
     # Common ports to check
     test_ports = [5050, 8080, 80, 443, 5000, 8000, 3000]
     
-    print("   Scanning common ports on 10.0.10.100:")
+    print(f"   Scanning common ports on {host}:")
+    
+    # Opt-in: importing scapy plus its reply window costs about as much as the connect
+    # scan below, so it only helps on hosts with many ports to sweep. Whatever it
+    # settles is served from the shared results by the connect scan
+    syn_results = syn_scan(host, test_ports) if use_syn_scan else None
+    if syn_results is not None:
+        for port, result in syn_results.items():
+            _tcp_results.setdefault((host, port), result)
+    
+    async def scan():
+        return await asyncio.gather(*(tcp_reachable_async(host, port) for port in test_ports))
+    
+    # All connects share one event loop, so a firewalled host costs one
+    # timeout window and the sweep scales to many ports without threads
+    results = asyncio.run(scan())
+    
     open_ports = []
     
-    for port in test_ports:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            result = sock.connect_ex(("10.0.10.100", port))
-            sock.close()
-            
-            if result == 0:
-                print(f"     ✓ Port {port}: OPEN")
-                open_ports.append(port)
-            else:
-                print(f"     ✗ Port {port}: CLOSED")
-        except:
+    for port, (reachable, error) in zip(test_ports, results):
+        if reachable:
+            print(f"     ✓ Port {port}: OPEN")
+            open_ports.append(port)
+        elif isinstance(error, OSError):
+            print(f"     ✗ Port {port}: CLOSED")
+        else:
             print(f"     ✗ Port {port}: ERROR")
     
     return open_ports
@@ -187,13 +324,14 @@ def compare_with_working_script():
     # Check for required modules
     required_modules = ['horus_media', 'horus_db', 'horus_camera', 'psycopg2']
     
+    # find_spec checks presence without running each module's import-time setup
     for module in required_modules:
-        try:
-            __import__(module)
+        if importlib.util.find_spec(module) is not None:
             print(f"   ✓ {module}: Available")
-        except ImportError:
+        else:
             print(f"   ✗ {module}: Missing")
 
+@buffered_output
 def generate_troubleshooting_report(tcp_ok, http_endpoints, image_endpoint_ok, working_configs, open_ports):
     """Generate comprehensive troubleshooting report"""
     print("\n" + "=" * 80)
@@ -268,8 +406,37 @@ def generate_troubleshooting_report(tcp_ok, http_endpoints, image_endpoint_ok, w
     print("3. If connectivity is fixed, restart your bridge server")
     print("4. Test image retrieval from your ArcGIS add-in")
 
+def run_connectivity_checks(horus_host, horus_port, use_syn_scan=False):
+    """Run the TCP, HTTP, image endpoint, alternative URL and port checks in order"""
+    horus_base_url = f"http://{horus_host}:{horus_port}"
+    
+    horus_ip = resolve_host(horus_host)
+    tcp_ok = test_basic_connectivity(horus_ip, horus_port)
+    
+    http_endpoints = []
+    if tcp_ok:
+        http_endpoints = test_http_service(horus_base_url)
+    
+    image_endpoint_ok = False
+    if http_endpoints:
+        image_endpoint_ok = test_horus_image_endpoint(horus_base_url)
+    
+    working_configs = test_alternative_urls()
+    open_ports = check_local_services(horus_ip, use_syn_scan)
+    
+    return tcp_ok, http_endpoints, image_endpoint_ok, working_configs, open_ports
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Horus Media Server Connectivity Diagnostics')
+    parser.add_argument('--check-env', action='store_true', help='Also compare the Python environment with the working script')
+    parser.add_argument('--syn-scan', action='store_true', help='Try a raw SYN scan (scapy, admin rights) before the port connect scan')
+    return parser.parse_args()
+
 def main():
     """Main diagnostic routine"""
+    args = parse_arguments()
+    
     print("Horus Media Server Connectivity Diagnostics")
     print(f"Timestamp: {datetime.now().isoformat()}")
     print("=" * 80)
@@ -284,24 +451,19 @@ def main():
     print(f"This is the same server your bridge is trying to reach")
     
     # Run all diagnostic tests
-    tcp_ok = test_basic_connectivity(horus_host, horus_port)
+    tcp_ok, http_endpoints, image_endpoint_ok, working_configs, open_ports = run_connectivity_checks(horus_host, horus_port, args.syn_scan)
     
-    http_endpoints = []
-    if tcp_ok:
-        http_endpoints = test_http_service(horus_base_url)
-    
-    image_endpoint_ok = False
-    if http_endpoints:
-        image_endpoint_ok = test_horus_image_endpoint(horus_base_url)
-    
-    working_configs = test_alternative_urls()
-    open_ports = check_local_services()
-    
-    compare_with_working_script()
+    if args.check_env:
+        compare_with_working_script()
     
     # Generate comprehensive report
     generate_troubleshooting_report(tcp_ok, http_endpoints, image_endpoint_ok, working_configs, open_ports)
     
+    print_diagnostic_summary(tcp_ok, http_endpoints, image_endpoint_ok, working_configs, open_ports)
+
+@buffered_output
+def print_diagnostic_summary(tcp_ok, http_endpoints, image_endpoint_ok, working_configs, open_ports):
+    """Print the one-screen summary of all diagnostic results"""
     print(f"\n" + "=" * 80)
     print("DIAGNOSTIC SUMMARY")
     print("=" * 80)
@@ -327,6 +489,7 @@ def main():
         print("   Fix server accessibility before testing bridge again.")
 
 if __name__ == "__main__":
+    use_utf8_stdout()
     try:
         main()
         print("\n" + "=" * 80)
@@ -4,9 +4,24 @@ Save this as 'debug_bridge_startup.py' and run it
 """
 
 import sys
-import traceback
 import os
-from datetime import datetime
+import functools
+import importlib
+import importlib.util
+import py_compile
+from concurrent.futures import ThreadPoolExecutor
+
+from diagnostic_helpers import ThreadCapturedStdout, buffered_output
+
+# Without these the bridge cannot start, so dependent probes are skipped
+CRITICAL_MODULES = {"flask", "psycopg2"}
+
+# Flask is imported once here; the Flask checks below report this result
+try:
+    from flask import Flask, request, jsonify
+    _FLASK_OK, _FLASK_ERR = True, None
+except ImportError as e:
+    _FLASK_OK, _FLASK_ERR = False, e
 
 def test_imports():
     """Test all required imports"""
@@ -33,10 +48,11 @@ def test_imports():
     failed_imports = []
     
     for module, description in required_imports:
+        # A broken native extension can raise OSError or AttributeError rather than ImportError
         try:
-            __import__(module)
+            importlib.import_module(module)
             print(f"   ✓ {module}: OK")
-        except ImportError as e:
+        except Exception as e:
             print(f"   ✗ {module}: FAILED - {e}")
             failed_imports.append((module, description, str(e)))
     
@@ -49,7 +65,7 @@ def test_pil_import():
         from PIL import Image
         print("   ✓ PIL.Image: OK")
         return True
-    except ImportError as e:
+    except Exception as e:
         print(f"   ✗ PIL.Image: FAILED - {e}")
         print("   Solution: conda install pillow")
         return False
@@ -59,18 +75,21 @@ def test_horus_imports():
     print("\nTesting Horus modules...")
     
     horus_modules = [
-        ("horus_media", "from horus_media import Client, Size"),
-        ("horus_db", "from horus_db import Frames, Recordings, Frame, Recording"),
-        ("horus_camera", "from horus_camera import SphericalCamera")
+        ("horus_media", ["Client", "Size"]),
+        ("horus_db", ["Frames", "Recordings", "Frame", "Recording"]),
+        ("horus_camera", ["SphericalCamera"])
     ]
     
     available_modules = []
-    for module_name, import_statement in horus_modules:
+    for module_name, names in horus_modules:
         try:
-            exec(import_statement)
+            module = importlib.import_module(module_name)
+            missing = [name for name in names if not hasattr(module, name)]
+            if missing:
+                raise ImportError(f"cannot import name(s) {', '.join(missing)} from '{module_name}'")
             print(f"   ✓ {module_name}: OK")
             available_modules.append(module_name)
-        except ImportError as e:
+        except Exception as e:
             print(f"   ✗ {module_name}: FAILED - {e}")
     
     return len(available_modules) == len(horus_modules), available_modules
@@ -82,7 +101,7 @@ def test_connection_settings():
         from Connection_settings import connection_settings, external_data
         print("   ✓ Connection_settings: OK")
         return True
-    except ImportError as e:
+    except Exception as e:
         print(f"   ✗ Connection_settings: FAILED - {e}")
         print("   This is OK - bridge will work without it")
         return False
@@ -90,8 +109,11 @@ def test_connection_settings():
 def test_flask_app_creation():
     """Test Flask app creation"""
     print("\nTesting Flask app creation...")
+    if not _FLASK_OK:
+        print(f"   ✗ Flask app creation: FAILED - {_FLASK_ERR}")
+        return False
+    
     try:
-        from flask import Flask, request, jsonify
         app = Flask(__name__)
         print("   ✓ Flask app creation: OK")
         return True
@@ -99,13 +121,52 @@ def test_flask_app_creation():
         print(f"   ✗ Flask app creation: FAILED - {e}")
         return False
 
+@functools.lru_cache(maxsize=1)
+def _env_snapshot():
+    """Python version, executable, working directory and first 3 path entries"""
+    return (sys.version, sys.executable, os.getcwd(), tuple(sys.path[:3]))
+
 def check_python_environment():
     """Check Python environment details"""
+    version, executable, cwd, path_head = _env_snapshot()
     print(f"\nPython Environment Check:")
-    print(f"   Python version: {sys.version}")
-    print(f"   Python executable: {sys.executable}")
-    print(f"   Current working directory: {os.getcwd()}")
-    print(f"   Python path: {sys.path[:3]}...")  # Show first 3 paths
+    print(f"   Python version: {version}")
+    print(f"   Python executable: {executable}")
+    print(f"   Current working directory: {cwd}")
+    print(f"   Python path: {list(path_head)}...")  # Show first 3 paths
+
+# Where the bridge server script lives, once found
+_bridge_script_path = None
+
+def find_bridge_script(possible_paths):
+    """Return the first existing bridge script path, checking HORUS_BRIDGE_SCRIPT first"""
+    global _bridge_script_path
+    if _bridge_script_path:
+        return _bridge_script_path
+    
+    override = os.environ.get("HORUS_BRIDGE_SCRIPT")
+    for path in ([override] if override else []) + possible_paths:
+        if os.path.isfile(path):
+            _bridge_script_path = path
+            return path
+    
+    return None
+
+def bytecode_is_fresh(path):
+    """Return True if __pycache__ already holds bytecode built from the current source"""
+    try:
+        with open(importlib.util.cache_from_source(path), 'rb') as f:
+            header = f.read(16)
+        source_stat = os.stat(path)
+    except (OSError, NotImplementedError):
+        return False
+    
+    # Timestamp-based pyc header: magic, flags (0), source mtime, source size
+    if len(header) < 16 or header[:4] != importlib.util.MAGIC_NUMBER or header[4:8] != b'\x00\x00\x00\x00':
+        return False
+    mtime = int.from_bytes(header[8:12], 'little')
+    size = int.from_bytes(header[12:16], 'little')
+    return mtime == (int(source_stat.st_mtime) & 0xFFFFFFFF) and size == (source_stat.st_size & 0xFFFFFFFF)
 
 def test_bridge_server_syntax():
     """Test if the bridge server script has syntax errors"""
@@ -118,28 +179,40 @@ def test_bridge_server_syntax():
         "C:/Users/samso/Source/Repos/Test/Scripts/horus_bridge_server.py"
     ]
     
-    bridge_script_path = None
-    for path in possible_paths:
-        if os.path.exists(path):
-            bridge_script_path = path
-            break
+    bridge_script_path = find_bridge_script(possible_paths)
     
     if not bridge_script_path:
         print("   ✗ Bridge server script not found")
         print(f"   Looked in: {possible_paths}")
+        print("   Set HORUS_BRIDGE_SCRIPT to the script's full path if it lives elsewhere")
         return False
     
     print(f"   Found bridge script at: {bridge_script_path}")
     
     try:
-        # Try to compile the script
-        with open(bridge_script_path, 'r') as f:
-            script_content = f.read()
+        # A pyc is only written after a clean compile, so a fresh one proves the syntax
+        if bytecode_is_fresh(bridge_script_path):
+            print("   ✓ Bridge script syntax: OK (cached bytecode)")
+            return True
+        
+        try:
+            py_compile.compile(bridge_script_path, doraise=True)
+        except PermissionError:
+            # __pycache__ is not writable; compile in memory instead
+            # Bytes let compile() honour the encoding cookie without a separate decode
+            with open(bridge_script_path, 'rb') as f:
+                script_content = f.read()
+            compile(script_content, bridge_script_path, 'exec', dont_inherit=True)
         
-        compile(script_content, bridge_script_path, 'exec')
         print("   ✓ Bridge script syntax: OK")
         return True
         
+    except py_compile.PyCompileError as pe:
+        se = pe.exc_value
+        print(f"   ✗ Bridge script syntax error: {se}")
+        if isinstance(se, SyntaxError):
+            print(f"   Line {se.lineno}: {se.text}")
+        return False
     except SyntaxError as se:
         print(f"   ✗ Bridge script syntax error: {se}")
         print(f"   Line {se.lineno}: {se.text}")
@@ -156,15 +229,15 @@ def simulate_bridge_startup():
         # Test the basic structure that should run
         print("   Testing basic Flask setup...")
         
-        from flask import Flask, request, jsonify
+        if not _FLASK_OK:
+            raise _FLASK_ERR
+        
         import json
         import logging
         
-        # Configure logging like the bridge does
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        # The bridge's log format; Formatter rejects an invalid one when it is built,
+        # and nothing is attached to the root logger
+        logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         
         print("   ✓ Basic setup: OK")
         
@@ -195,12 +268,36 @@ def simulate_bridge_startup():
         return True
         
     except Exception as e:
+        # Only loaded on failure; the success path never needs traceback
+        import traceback
         print(f"   ✗ Bridge startup simulation: FAILED - {e}")
         print(f"   Traceback: {traceback.format_exc()}")
         return False
 
+def run_probes(import_probes, background_probe):
+    """Run import_probes one after another while background_probe runs alongside, printing output in that order"""
+    # Import probes share module graphs, and a second thread importing the same module
+    # can see it half-initialized, so only the probe that imports nothing gets a thread
+    stdout = ThreadCapturedStdout(sys.stdout)
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            background = executor.submit(stdout.capture, background_probe)
+            results = [stdout.capture(probe) for probe in import_probes]
+            results.append(background.result())
+    finally:
+        sys.stdout = stdout._stream
+    
+    for _, output in results:
+        sys.stdout.write(output)
+    return [result for result, _ in results]
+
+# The Enter prompt in __main__ runs after main() returns, so it stays unbuffered
+@buffered_output
 def main():
     """Main diagnostic function"""
+    from datetime import datetime
+    
     print("Bridge Server Startup Diagnostic")
     print(f"Timestamp: {datetime.now().isoformat()}")
     print("=" * 60)
@@ -208,26 +305,27 @@ def main():
     # Check environment
     check_python_environment()
     
-    # Test imports
-    failed_imports = test_imports()
-    
-    # Test PIL separately (common issue)
-    pil_ok = test_pil_import()
-    
-    # Test Horus modules
-    horus_ok, horus_modules = test_horus_imports()
+    # Without Flask the app creation probe would only repeat the import failure
+    flask_probe = test_flask_app_creation if _FLASK_OK else (lambda: False)
     
-    # Test Connection_settings
-    conn_settings_ok = test_connection_settings()
+    # The script syntax check reads and compiles a file while the import probes run
+    (failed_imports, pil_ok, (horus_ok, horus_modules),
+     conn_settings_ok, flask_ok, syntax_ok) = run_probes([
+        test_imports,
+        test_pil_import,
+        test_horus_imports,
+        test_connection_settings,
+        flask_probe,
+    ], test_bridge_server_syntax)
     
-    # Test Flask
-    flask_ok = test_flask_app_creation()
-    
-    # Test bridge script syntax
-    syntax_ok = test_bridge_server_syntax()
-    
-    # Simulate startup
-    startup_ok = simulate_bridge_startup()
+    # Simulate startup once everything it relies on has been checked
+    critical_missing = {module for module, _, _ in failed_imports} & CRITICAL_MODULES
+    if critical_missing:
+        print("\nSimulating bridge server startup...")
+        print(f"   - Skipped: {', '.join(sorted(critical_missing))} not installed")
+        startup_ok = False
+    else:
+        startup_ok = simulate_bridge_startup()
     
     # Generate report
     print("\n" + "=" * 60)
@@ -280,16 +378,21 @@ def main():
         print("   python horus_bridge_server.py --host localhost --port 5001")
         print("2. Check for any error messages that appear")
         print("3. Verify no other service is using port 5001")
+    
+    all_ok = not failed_imports and pil_ok and flask_ok and syntax_ok and startup_ok
+    return 0 if all_ok else 1
 
 if __name__ == "__main__":
     try:
-        main()
+        exit_code = main()
         print("\n" + "=" * 60)
         print("Diagnostic completed. Press Enter to exit...")
         input()
+        sys.exit(exit_code)
     except KeyboardInterrupt:
         print("\nDiagnostic interrupted by user")
     except Exception as e:
+        import traceback
         print(f"\nDiagnostic script failed: {e}")
         print(f"Traceback: {traceback.format_exc()}")
         input("Press Enter to exit...")
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Combined Horus Diagnostics
+Runs the database and media server checks side by side, then prints both reports
+"""
+
+import argparse
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import db_dianostic
+import debug_bridge_diagnose
+from diagnostic_helpers import ThreadCapturedStdout, use_utf8_stdout
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Combined Horus Diagnostics')
+    parser.add_argument('--check-env', action='store_true', help='Also check the Python environment and ArcGIS Pro modules')
+    return parser.parse_args()
+
+def main():
+    """Main diagnostic routine"""
+    args = parse_arguments()
+
+    print("Horus Diagnostics (database + media server)")
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print("=" * 80)
+
+    # Configuration from your logs
+    db_host = "10.0.10.100"
+    db_port = "5432"
+    database = "HorusWebMoviePlayer"
+    user = "pocmsro"
+    horus_host = "10.0.10.100"
+    horus_port = 5050
+
+    # Ask up front so nothing prompts once the checks are running
+    password = input("Enter database password: ").strip()
+    if not password:
+        print("Error: Password is required")
+        return
+
+    # The two chains are independent, so the run takes as long as the slower one
+    stdout = ThreadCapturedStdout(sys.stdout)
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            db_future = executor.submit(
+                stdout.capture, db_dianostic.run_database_checks,
+                db_host, db_port, database, user, password
+            )
+            horus_future = executor.submit(
+                stdout.capture, debug_bridge_diagnose.run_connectivity_checks,
+                horus_host, horus_port
+            )
+            db_conn_str, db_output = db_future.result()
+            horus_results, horus_output = horus_future.result()
+    finally:
+        sys.stdout = stdout._stream
+
+    print("\nDATABASE CHECKS")
+    print("=" * 80, end="")
+    sys.stdout.write(db_output)
+
+    print("\n\nHORUS MEDIA SERVER CHECKS")
+    print("=" * 80, end="")
+    sys.stdout.write(horus_output)
+
+    if args.check_env:
+        print("\n")
+        db_dianostic.check_environment()
+        debug_bridge_diagnose.compare_with_working_script()
+
+    db_dianostic.generate_troubleshooting_report(db_host, db_port, database, user, db_conn_str)
+    debug_bridge_diagnose.generate_troubleshooting_report(*horus_results)
+    debug_bridge_diagnose.print_diagnostic_summary(*horus_results)
+
+if __name__ == "__main__":
+    use_utf8_stdout()
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nDiagnostics interrupted by user")
+    except Exception as e:
+        print(f"\nDiagnostic script failed: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
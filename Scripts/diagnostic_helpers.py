@@ -0,0 +1,59 @@
+"""
+Shared helpers for the Horus diagnostic scripts
+Output handling and host resolution used by db_dianostic, debug_bridge_diagnose,
+debug_bridge_startup and diagnose
+"""
+
+import contextlib
+import functools
+import io
+import socket
+import sys
+import threading
+
+def use_utf8_stdout():
+    """Print the ✓/✗ markers as UTF-8 instead of the console codepage"""
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+def buffered_output(func):
+    """Collect everything func prints and write it to stdout in one call"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        buf = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buf):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buf.getvalue())
+            sys.stdout.flush()
+    return wrapper
+
+class ThreadCapturedStdout:
+    """Stand-in for sys.stdout that gives each worker thread its own buffer"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self, func, *args):
+        """Run func with this thread's output collected, returning (result, output)"""
+        self._local.buffer = io.StringIO()
+        try:
+            return func(*args), self._local.buffer.getvalue()
+        finally:
+            self._local.buffer = None
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._stream).write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+def resolve_host(host):
+    """Resolve host once so later probes skip the DNS lookup"""
+    try:
+        return socket.gethostbyname(host)
+    except OSError:
+        return host
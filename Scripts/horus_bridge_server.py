@@ -1,4 +1,5 @@
-﻿from flask import Flask, request, jsonify
+﻿from flask import Flask, Response, request, jsonify
+from werkzeug.exceptions import HTTPException
 import json
 import logging
 import traceback
@@ -8,12 +9,23 @@ import io
 import os
 import sys
 import argparse
+import collections
+import contextlib
+import functools
+import hashlib
+import hmac
+import importlib.util
 from typing import List, Dict, Any
-import itertools
 from PIL import Image
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+from psycopg2 import sql
 import socket
+import threading
 import time
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Try to import Connection_settings module
 try:
@@ -35,6 +47,36 @@ except ImportError as e:
     print("The server will start but Horus functionality will be limited")
     HORUS_AVAILABLE = False
 
+# Try to import PyTurboJPEG (libjpeg-turbo SIMD encoder, faster than Pillow's JPEG path)
+try:
+    import numpy as np
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJSAMP_420
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
+# Try to import orjson (C JSON encoder, much faster on the large base64 image payloads)
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Try to import Flask-Compress (gzip/brotli for the JSON responses, base64 images compress well)
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+
+# Try to import waitress (multi-threaded WSGI server for serving requests concurrently)
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -42,50 +84,156 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def log_exception(message, error):
+    """Log an unexpected error as one record, with its traceback attached only when DEBUG is enabled"""
+    logger.error("%s: %s", message, error, exc_info=logger.isEnabledFor(logging.DEBUG))
+
+# Importable as-is by a WSGI server, e.g. `waitress-serve --threads=16 horus_bridge_server:app`;
+# the __main__ block (with --config) only runs when the script is started directly
 app = Flask(__name__)
 
+# Request bodies are small JSON documents; anything bigger is refused before it reaches a route
+MAX_REQUEST_BODY_SIZE = 1024 * 1024
+app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BODY_SIZE
+
+if ORJSON_AVAILABLE:
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider that serializes responses and parses request bodies with orjson"""
+        
+        # Sorted keys like Flask's default provider; numpy arrays are serialized natively
+        options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        
+        def dumps(self, obj, **kwargs):
+            # Anything orjson can't handle (Decimal, UUID, dataclasses) goes to Flask's fallback
+            return orjson.dumps(obj, default=self.default, option=self.options).decode()
+        
+        def loads(self, s, **kwargs):
+            # request.json parses through here; orjson's decode errors are ValueErrors,
+            # so a malformed body still becomes Flask's 400
+            return orjson.loads(s)
+        
+        def response(self, *args, **kwargs):
+            # Hand orjson's bytes straight to the response instead of decoding and re-encoding them
+            obj = self._prepare_response_obj(args, kwargs)
+            body = orjson.dumps(obj, default=self.default, option=self.options | orjson.OPT_APPEND_NEWLINE)
+            return self._app.response_class(body, mimetype=self.mimetype)
+    
+    app.json = OrjsonProvider(app)
+
+if COMPRESS_AVAILABLE:
+    # Only the default text/JSON mimetypes, so the JPEG routes are never recompressed.
+    # Streams are left alone so their parts still go out as they are produced
+    app.config.update(
+        COMPRESS_ALGORITHM=['br', 'gzip'],
+        COMPRESS_MIN_SIZE=1024,
+        COMPRESS_LEVEL=4,
+        COMPRESS_BR_LEVEL=4,
+        COMPRESS_STREAMS=False,
+    )
+    Compress(app)
+
+# Quality for frames that get_image() hands back decoded; visually the same as 95 at about half the bytes
+JPEG_QUALITY = 85
+
+# Most frame images /images fetches from the Horus server at once; matches the Horus
+# session's pool_connections, so every worker keeps its own socket alive
+IMAGE_FETCH_WORKERS = 16
+
+# Shared by all image requests so its threads, and the cameras they keep, outlive a request
+image_executor = ThreadPoolExecutor(max_workers=IMAGE_FETCH_WORKERS, thread_name_prefix="horus-image")
+
+# How long GET /recordings serves the list from memory before querying again
+RECORDINGS_CACHE_TTL = 60
+
+# How long clients may reuse a GET /image response without asking again (a year)
+IMAGE_CACHE_MAX_AGE = 365 * 24 * 3600
+
+# How long GET /debug-db reuses its schema and table details
+DEBUG_DB_CACHE_TTL = 30
+
+# Line-delimited JSON that POST /images streams when the client accepts it
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Answer of the image routes when horus_media is missing; it can't change, so it is serialized once
+HORUS_UNAVAILABLE_BODY = app.json.dumps({
+    "Success": False,
+    "Error": "Horus modules are not available"
+})
+
+RECORDINGS_QUERY = "SELECT id, directory FROM recordings ORDER BY id"
+
+TABLE_SCAN_STATS_QUERY = """
+    SELECT t.relname, t.seq_scan, i.indexrelname, i.idx_scan
+    FROM pg_stat_user_tables t
+    LEFT JOIN pg_stat_user_indexes i ON i.relid = t.relid
+    WHERE t.schemaname = 'public' AND t.relname = ANY(%s)
+"""
+
+FIRST_FRAMES_QUERY = 'SELECT "index" FROM frames WHERE recordingid = %s ORDER BY "index" LIMIT %s'
+
+# Seconds a request waits for a pooled database connection before giving up
+POOL_WAIT_TIMEOUT = 30
+
+# Seconds a passing network/PostgreSQL probe of a host:port is trusted before probing again
+PROBE_CACHE_TTL = 30
+
+def cache_passing_probe(probe):
+    """Reuse a probe's passing (ok, message) result per (host, port) for PROBE_CACHE_TTL seconds"""
+    passed = {}  # (host, port) -> (probed_at, result)
+    
+    @functools.wraps(probe)
+    def wrapper(host, port, *args, **kwargs):
+        key = (str(host), str(port))
+        hit = passed.get(key)
+        if hit and time.monotonic() - hit[0] < PROBE_CACHE_TTL:
+            return hit[1]
+        result = probe(host, port, *args, **kwargs)
+        if result[0]:
+            passed[key] = (time.monotonic(), result)
+        else:
+            passed.pop(key, None)
+        return result
+    
+    wrapper.cache_clear = passed.clear
+    return wrapper
+
 class DatabaseConnectionDiagnostics:
     """Enhanced database connection with diagnostics"""
     
     @staticmethod
+    @cache_passing_probe
     def test_network_connectivity(host, port, timeout=10):
         """Test basic network connectivity to database server"""
         try:
             logger.info(f"Testing network connectivity to {host}:{port}")
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            result = sock.connect_ex((host, int(port)))
-            sock.close()
+            with socket.create_connection((host, int(port)), timeout=timeout):
+                pass
             
-            if result == 0:
-                logger.info("✓ Network connectivity: SUCCESS")
-                return True, "Network connectivity successful"
-            else:
-                error_msg = f"Network connectivity failed (error code: {result})"
-                logger.error(f"✗ {error_msg}")
-                return False, error_msg
-                
+            logger.info("✓ Network connectivity: SUCCESS")
+            return True, "Network connectivity successful"
+            
+        except OSError as e:
+            error_msg = f"Network connectivity failed ({e})"
+            logger.error(f"✗ {error_msg}")
+            return False, error_msg
         except Exception as e:
             error_msg = f"Network connectivity test exception: {e}"
             logger.error(f"✗ {error_msg}")
             return False, error_msg
     
     @staticmethod
+    @cache_passing_probe
     def test_postgresql_response(host, port, timeout=5):
         """Test if PostgreSQL service is responding"""
         try:
             logger.info(f"Testing PostgreSQL service response on {host}:{port}")
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            sock.connect((host, int(port)))
-            
-            # Send a basic PostgreSQL startup message
-            startup_msg = b'\x00\x00\x00\x08\x04\xd2\x16\x2f'
-            sock.send(startup_msg)
-            
-            # Try to receive response
-            response = sock.recv(1024)
-            sock.close()
+            with socket.create_connection((host, int(port)), timeout=timeout) as sock:
+                # Send a basic PostgreSQL startup message
+                startup_msg = b'\x00\x00\x00\x08\x04\xd2\x16\x2f'
+                sock.sendall(startup_msg)
+                
+                # Try to receive response
+                response = sock.recv(1024)
             
             if response:
                 logger.info("✓ PostgreSQL service is responding")
@@ -102,66 +250,101 @@ class DatabaseConnectionDiagnostics:
     
     @staticmethod
     def try_connection_methods(host, port, database, user, password):
-        """Try multiple connection methods with detailed error reporting"""
+        """Try multiple connection methods concurrently, returning (db_info, conn_str, name) for the first that succeeds"""
         connection_methods = [
             {
                 "name": "Standard Format",
-                "conn_str": f"host={host} port={port} dbname={database} user={user} password={password} connect_timeout=15"
+                "conn_str": f"host={host} port={port} dbname={database} user={user} password={password} connect_timeout=5"
             },
             {
                 "name": "Quoted Format",
-                "conn_str": f"host='{host}' port='{port}' dbname='{database}' user='{user}' password='{password}' connect_timeout=15"
+                "conn_str": f"host='{host}' port='{port}' dbname='{database}' user='{user}' password='{password}' connect_timeout=5"
             },
             {
                 "name": "URI Format",
-                "conn_str": f"postgresql://{user}:{password}@{host}:{port}/{database}?connect_timeout=15"
+                "conn_str": f"postgresql://{user}:{password}@{host}:{port}/{database}?connect_timeout=5"
             },
             {
                 "name": "SSL Disabled",
-                "conn_str": f"host={host} port={port} dbname={database} user={user} password={password} sslmode=disable connect_timeout=15"
+                "conn_str": f"host={host} port={port} dbname={database} user={user} password={password} sslmode=disable connect_timeout=5"
             },
             {
                 "name": "SSL Prefer",
-                "conn_str": f"host={host} port={port} dbname={database} user={user} password={password} sslmode=prefer connect_timeout=15"
+                "conn_str": f"host={host} port={port} dbname={database} user={user} password={password} sslmode=prefer connect_timeout=5"
             }
         ]
         
-        for method in connection_methods:
-            logger.info(f"Trying {method['name']} connection method...")
-            try:
-                conn = psycopg2.connect(method['conn_str'])
-                cursor = conn.cursor()
-                cursor.execute("SELECT version(), current_database(), current_user")
-                result = cursor.fetchone()
-                cursor.close()
-                conn.close()
+        logger.info(f"Trying {len(connection_methods)} connection methods in parallel...")
+        # Every method is attempted at once; the first to authenticate wins and the
+        # rest finish (and close their connections) in the background
+        executor = ThreadPoolExecutor(max_workers=len(connection_methods))
+        try:
+            futures = {
+                executor.submit(DatabaseConnectionDiagnostics._query_connection_info, method['conn_str']): method
+                for method in connection_methods
+            }
+            for future in as_completed(futures):
+                method = futures[future]
+                try:
+                    result = future.result()
+                except psycopg2.OperationalError as op_ex:
+                    logger.warning(f"✗ {method['name']} failed - Operational: {op_ex}")
+                    continue
+                except psycopg2.Error as pg_ex:
+                    logger.warning(f"✗ {method['name']} failed - PostgreSQL: {pg_ex}")
+                    continue
+                except Exception as ex:
+                    logger.warning(f"✗ {method['name']} failed - General: {ex}")
+                    continue
                 
                 logger.info(f"✓ SUCCESS with {method['name']} method")
                 logger.info(f"  Database: {result[1]}, User: {result[2]}")
                 logger.info(f"  Version: {result[0][:60]}...")
                 
-                return conn, method['conn_str'], method['name']
-                
-            except psycopg2.OperationalError as op_ex:
-                logger.warning(f"✗ {method['name']} failed - Operational: {op_ex}")
-                
-            except psycopg2.Error as pg_ex:
-                logger.warning(f"✗ {method['name']} failed - PostgreSQL: {pg_ex}")
-                
-            except Exception as ex:
-                logger.warning(f"✗ {method['name']} failed - General: {ex}")
+                return result, method['conn_str'], method['name']
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         return None, None, None
+    
+    @staticmethod
+    def _query_connection_info(conn_str):
+        """Connect with one connection string and return (version, database, user)"""
+        conn = psycopg2.connect(conn_str)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT version(), current_database(), current_user")
+                return cursor.fetchone()
+        finally:
+            conn.close()
 
 class HorusMediaBridge:
     def __init__(self):
         self.client = None
-        self.db_connection = None
+        self.db_pool = None
+        self.db_pool_max = 20  # request threads hold one connection each; main() matches this to the server's threads
+        self._pool_slots = None  # semaphore sized to db_pool, so requests queue for a free connection
         self.is_connected = False
         self.connection_string = None
         self.connection_method = None
+        self._dsn = None  # (db_config values, connection string)
+        self._recordings_cache = None  # (expires_at, recordings)
+        self._recordings_response = None  # (recordings, /recordings body, its ETag)
+        self._connected_config = None  # digest of the /connect payload the open connections were made with
+        self._debug_db_cache = None  # (expires_at, /debug-db details)
+        self.jpeg_encoder = None
+        self._camera_local = threading.local()  # one configured SphericalCamera per thread
+        self._managers = {}  # pooled connection -> (Recordings, Frames)
+    
+        # The Python package can be installed without the libjpeg-turbo library it loads
+        if TURBOJPEG_AVAILABLE:
+            try:
+                self.jpeg_encoder = TurboJPEG()
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"libjpeg-turbo not usable, encoding JPEGs with Pillow: {e}")
     
-        # Initialize default configuration
+        # Initialize default configuration. host/port may also point at a PgBouncer
+        # in transaction pooling mode; the bridge keeps no session state between queries
         self.db_config = {
             "host": "10.0.10.100",
             "port": "5432",
@@ -215,17 +398,19 @@ class HorusMediaBridge:
         required_fields = ['host', 'port', 'database', 'user', 'password']
         for field in required_fields:
             value = db_section.get(field)
-            logger.info(f"Field '{field}':")
-            logger.info(f"  Present: {field in db_section}")
-            logger.info(f"  Type: {type(value)}")
-            logger.info(f"  Value: {'***' if field == 'password' and value else repr(value)}")
+            logger.info(
+                "Field '%s': present=%s, type=%s, value=%s",
+                field, field in db_section, type(value),
+                '***' if field == 'password' and value else repr(value)
+            )
             if field == 'password' and value:
-                logger.info(f"  Length: {len(value)}")
-                logger.info(f"  First char: '{value[0]}' (ASCII: {ord(value[0])})")
-                logger.info(f"  Last char: '{value[-1]}' (ASCII: {ord(value[-1])})")
-                logger.info(f"  Contains $: {'$' in value}")
-                logger.info(f"  Contains %: {'%' in value}")
-                logger.info(f"  All chars visible: {all(32 <= ord(c) <= 126 for c in value)}")
+                # str methods check every character in C instead of a generator over ord()
+                logger.info(
+                    "  Length: %d, first char: '%s' (ASCII: %d), last char: '%s' (ASCII: %d), "
+                    "contains $: %s, contains %%: %s, all chars visible: %s",
+                    len(value), value[0], ord(value[0]), value[-1], ord(value[-1]),
+                    '$' in value, '%' in value, value.isascii() and value.isprintable()
+                )
     
         logger.info("=== END CONFIG DEBUG ===")
         return True
@@ -240,7 +425,7 @@ class HorusMediaBridge:
     
         try:
             # Test with the exact same method that worked in diagnosis
-            test_conn_str = f"host={self.db_config['host']} port={self.db_config['port']} dbname={self.db_config['database']} user={self.db_config['user']} password={password}"
+            test_conn_str = self.get_database_connection_string(password=password)
         
             logger.info("Testing received password with working method...")
             test_conn = psycopg2.connect(test_conn_str)
@@ -270,7 +455,7 @@ class HorusMediaBridge:
         
             for fix_name, fixed_password in fixes:
                 try:
-                    test_conn_str = f"host={self.db_config['host']} port={self.db_config['port']} dbname={self.db_config['database']} user={self.db_config['user']} password={fixed_password}"
+                    test_conn_str = self.get_database_connection_string(password=fixed_password)
                     test_conn = psycopg2.connect(test_conn_str)
                     test_conn.close()
                     logger.info(f"✅ SUCCESS with {fix_name}: '{fixed_password}'")
@@ -282,39 +467,58 @@ class HorusMediaBridge:
         
             return False
 
+    def get_database_connection_string(self, password=None):
+        """Build a libpq connection string from db_config, optionally with another password"""
+        # Same fields as horus_test_get_img.py; make_dsn quotes values and skips unset ones
+        return psycopg2.extensions.make_dsn(
+            host=self.db_config.get('host'),
+            port=self.db_config.get('port'),
+            dbname=self.db_config.get('database'),
+            user=self.db_config.get('user'),
+            password=self.db_config.get('password') if password is None else password,
+        )
+    
+    @property
+    def dsn(self):
+        """Connection string for the current db_config, rebuilt only when the config changes"""
+        # db_config is also patched in place (password fallbacks), so compare values too
+        key = tuple(self.db_config.get(field) for field in ('host', 'port', 'database', 'user', 'password'))
+        if self._dsn is None or self._dsn[0] != key:
+            self._dsn = (key, self.get_database_connection_string())
+        return self._dsn[1]
+
     def update_config(self, config_data):
         """Enhanced config update with detailed logging"""
         try:
             logger.info("📝 Updating bridge configuration...")
         
             if 'database' in config_data:
+                self._dsn = None
                 old_password = self.db_config.get('password', '')
                 self.db_config.update(config_data['database'])
                 new_password = self.db_config.get('password', '')
             
-                logger.info(f"Database config updated:")
-                logger.info(f"  host: {self.db_config.get('host')}")
-                logger.info(f"  port: {self.db_config.get('port')}")
-                logger.info(f"  database: {self.db_config.get('database')}")
-                logger.info(f"  user: {self.db_config.get('user')}")
-                logger.info(f"  password changed: {old_password != new_password}")
-                logger.info(f"  password length: {len(new_password) if new_password else 0}")
+                logger.info("Database config updated:")
+                logger.info("  host: %s", self.db_config.get('host'))
+                logger.info("  port: %s", self.db_config.get('port'))
+                logger.info("  database: %s", self.db_config.get('database'))
+                logger.info("  user: %s", self.db_config.get('user'))
+                logger.info("  password changed: %s", old_password != new_password)
+                logger.info("  password length: %d", len(new_password) if new_password else 0)
         
             if 'horus' in config_data:
                 self.horus_config.update(config_data['horus'])
                 if 'url' in config_data['horus']:
                     url = config_data['horus']['url']
                     if '://' in url:
-                        url_parts = url.replace('http://', '').replace('https://', '').split(':')
-                        if len(url_parts) >= 2:
-                            self.horus_config['host'] = url_parts[0]
-                            port_part = url_parts[1].split('/')[0]
-                            try:
-                                self.horus_config['port'] = int(port_part)
-                            except ValueError:
-                                logger.warning(f"Could not parse port from URL: {url}")
+                        # A bad port raises ValueError, which fails the whole update
+                        url_parts = urlsplit(url)
+                        port = url_parts.port or 5050
+                        if url_parts.hostname:
+                            self.horus_config['host'] = url_parts.hostname
+                            self.horus_config['port'] = port
                 
-                logger.info(f"Updated Horus config: url={self.horus_config.get('url', 'not set')}")
+                logger.info("Updated Horus config: url=%s", self.horus_config.get('url', 'not set'))
                 
             return True
         except Exception as e:
@@ -334,23 +538,20 @@ class HorusMediaBridge:
         
             logger.info(f"Attempting database connection to: {self.db_config['host']}:{self.db_config['port']}/{self.db_config['database']}")
         
-            # Build connection string like horus_test_get_img.py
-            db_params = [
-                ("host", self.db_config['host']),
-                ("port", self.db_config['port']),
-                ("dbname", self.db_config['database']),
-                ("user", self.db_config['user']),
-                ("password", self.db_config['password']),
-            ]
-            connection_string = " ".join(map("=".join, filter(lambda x: x[1] is not None, db_params)))
+            connection_string = self.dsn
         
-            logger.info(f"Connection string: {connection_string.replace(self.db_config['password'], '***')}")
+            logger.info(f"Connection string: {self.get_database_connection_string(password='***')}")
         
-            self.db_connection = psycopg2.connect(connection_string)
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT version(), current_database(), current_user")
-            result = cursor.fetchone()
-            cursor.close()
+            # Replace any pool left from an earlier connect; building the new one opens
+            # its first connections, so bad settings fail here
+            self.close_database()
+            self._pool_slots = threading.BoundedSemaphore(self.db_pool_max)
+            self.db_pool = psycopg2.pool.ThreadedConnectionPool(2, self.db_pool_max, connection_string)
+            with self.acquire() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT version(), current_database(), current_user")
+                result = cursor.fetchone()
+                cursor.close()
         
             logger.info(f"Database connection: SUCCESS - Connected to {result[1]} as {result[2]}")
             logger.info(f"PostgreSQL version: {result[0][:60]}...")
@@ -361,21 +562,116 @@ class HorusMediaBridge:
         
         except psycopg2.OperationalError as op_ex:
             logger.error(f"Database connection failed - Operational Error: {op_ex}")
-            self.db_connection = None
+            # The server may have gone away, or the password changed, so the next
+            # diagnostics must check again
+            DatabaseConnectionDiagnostics.test_network_connectivity.cache_clear()
+            DatabaseConnectionDiagnostics.test_postgresql_response.cache_clear()
+            verified_credentials.clear()
+            self.close_database()
             return False
         except psycopg2.Error as pg_ex:
             logger.error(f"Database connection failed - PostgreSQL Error: {pg_ex}")
-            self.db_connection = None
+            self.close_database()
             return False
         except ValueError as ve:
             logger.error(f"Database configuration error: {ve}")
-            self.db_connection = None
+            self.close_database()
+            return False
+        except Exception as e:
+            log_exception("Database connection failed with unexpected error", e)
+            self.close_database()
             return False
+    
+    def encode_jpeg(self, image):
+        """Encode a PIL Image as JPEG (bytes or a buffer view), with libjpeg-turbo when available"""
+        if self.jpeg_encoder:
+            rgb = image if image.mode == 'RGB' else image.convert('RGB')
+            return self.jpeg_encoder.encode(np.asarray(rgb), quality=JPEG_QUALITY, pixel_format=TJPF_RGB, jpeg_subsample=TJSAMP_420)
+        
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=JPEG_QUALITY)
+        # Hand out a view of the encoded data rather than a getvalue() copy of it
+        return buffer.getbuffer()
+    
+    def get_camera(self):
+        """Return this thread's SphericalCamera, configured for the current Horus client"""
+        local = self._camera_local
+        if getattr(local, 'client', None) is not self.client:
+            # SphericalCamera holds the current frame, so threads can't share one
+            sp_camera = SphericalCamera()
+            sp_camera.set_network_client(self.client)
+            sp_camera.set_horizontal_fov(90)  # Default value
+            sp_camera.set_yaw(0)
+            sp_camera.set_pitch(-30)
+            local.camera, local.client = sp_camera, self.client
+        return local.camera
+    
+    def get_managers(self, conn):
+        """Return the Recordings and Frames managers for a pooled connection"""
+        managers = self._managers.get(conn)
+        if managers is None:
+            managers = self._managers[conn] = (Recordings(conn), Frames(conn))
+        return managers
+    
+    @contextlib.contextmanager
+    def acquire(self):
+        """Borrow a connection from the pool for the duration of a request"""
+        pool, slots = self.db_pool, self._pool_slots
+        # The development server starts a thread per request with no limit, so more
+        # requests than connections can overlap; they wait here instead of getconn()
+        # raising PoolError
+        if not slots.acquire(timeout=POOL_WAIT_TIMEOUT):
+            raise psycopg2.pool.PoolError(f"No database connection became free within {POOL_WAIT_TIMEOUT} seconds")
+        try:
+            conn = pool.getconn()
+            if not conn.autocommit:
+                # The bridge only reads, so each query can run on its own instead of holding a
+                # transaction (and, behind PgBouncer, a server connection) for the whole request.
+                # Set client-side only: a SET-based option like readonly would not survive
+                # transaction pooling
+                conn.autocommit = True
+            try:
+                yield conn
+            finally:
+                # putconn rolls back anything left open and drops broken connections
+                pool.putconn(conn)
+        finally:
+            slots.release()
+    
+    def close_database(self):
+        """Close every pooled database connection"""
+        self._connected_config = None
+        self._recordings_cache = None
+        self._recordings_response = None
+        self._debug_db_cache = None
+        resolve_recording.cache_clear()
+        frame_image.cache_clear()
+        self._managers = {}
+        if self.db_pool:
+            self.db_pool.closeall()
+            self.db_pool = None
+    
+    def connections_alive(self) -> bool:
+        """Check that the open pool and Horus client still answer, so /connect can reuse them"""
+        try:
+            with self.acquire() as conn, conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
         except Exception as e:
-            logger.error(f"Database connection failed with unexpected error: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            self.db_connection = None
+            logger.warning("Pooled database connection is no longer usable: %s", e)
             return False
+        
+        if HORUS_AVAILABLE:
+            if not (self.client and self.is_connected):
+                return False
+            # The client holds no live session of its own, so the server answering a TCP
+            # connect is what "still connected" means for it
+            try:
+                with socket.create_connection((self.horus_config['host'], int(self.horus_config['port'])), timeout=5):
+                    pass
+            except (OSError, ValueError) as e:
+                logger.warning("Horus server is no longer reachable: %s", e)
+                return False
+        return True
     
     def connect_horus(self, horus_url=None) -> bool:
         """Connect to Horus media server - FIXED VERSION"""
@@ -390,6 +686,7 @@ class HorusMediaBridge:
             # FIXED: Just create the client without testing _session
             self.client = Client(url, timeout=20)
             self.client.attempts = 5
+            self.tune_horus_session()
             
             # If we got here without exception, consider it successful
             self.is_connected = True
@@ -397,100 +694,62 @@ class HorusMediaBridge:
             return True
             
         except Exception as e:
-            logger.error(f"Failed to create Horus client: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            log_exception("Failed to create Horus client", e)
             self.is_connected = False
             return False
     
-    def debug_recording_attributes(self, recording, index):
-        """Debug what attributes a Recording object actually has"""
-        logger.info(f"=== DEBUGGING RECORDING {index} ATTRIBUTES ===")
+    def tune_horus_session(self):
+        """Size the Horus client's HTTP connection pool for concurrent image fetches"""
+        session = getattr(self.client, '_session', None)
+        if session is None or not hasattr(session, 'mount'):
+            return
+        
+        from requests.adapters import HTTPAdapter
+        
+        # Enough kept-alive sockets for every image worker plus the request threads.
+        # Retries stay with the client (attempts), so the adapter doesn't add its own
+        adapter = HTTPAdapter(pool_connections=IMAGE_FETCH_WORKERS, pool_maxsize=2 * IMAGE_FETCH_WORKERS)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
     
+    def get_recordings(self, refresh=False) -> List[Dict]:
+        """Get the list of recordings for the add-in"""
         try:
-            # Get all attributes
-            all_attrs = dir(recording)
-            logger.info(f"All attributes: {all_attrs}")
-        
-            # Check for common attributes
-            common_attrs = ['id', 'directory', 'created', 'created_at', 'timestamp', 'name', 'setup']
-            for attr in common_attrs:
-                if hasattr(recording, attr):
-                    value = getattr(recording, attr)
-                    logger.info(f"  {attr}: {value} (type: {type(value)})")
-                else:
-                    logger.info(f"  {attr}: NOT PRESENT")
-        
-            # Check for any date-related attributes
-            date_attrs = [attr for attr in all_attrs if 'date' in attr.lower() or 'time' in attr.lower() or 'created' in attr.lower()]
-            logger.info(f"Date-related attributes: {date_attrs}")
-        
-        except Exception as debug_ex:
-            logger.error(f"Debug recording attributes failed: {debug_ex}")
-    
-        logger.info("=== END RECORDING DEBUG ===")
-
-    def get_recordings(self) -> List[Dict]:
-        """Get recordings with enhanced debugging - FIXED VERSION"""
-        try:
-            if not self.db_connection:
+            if not self.db_pool:
                 logger.warning("No database connection for retrieving recordings")
                 return []
 
-            if not HORUS_AVAILABLE:
-                logger.warning("Horus modules not available for retrieving recordings")
-                return []
+            cached = self._recordings_cache
+            if cached and cached[0] > time.monotonic() and not refresh:
+                logger.info("Returning %d cached recordings", len(cached[1]))
+                return cached[1]
 
             logger.info("Starting to retrieve recordings from database...")
         
-            recordings_manager = Recordings(self.db_connection)
-            query_results = list(Recording.query(recordings_manager))
-        
-            logger.info(f"Horus ORM query returned {len(query_results)} recordings")
-        
-            # Debug the first recording to understand the structure
-            if query_results:
-                logger.info("Debugging first recording to understand structure...")
-                self.debug_recording_attributes(query_results[0], 1)
-        
+            # The list only needs id and directory, so one plain query replaces the ORM
+            # scan plus a get_setup() round trip per recording
+            # Entries are built straight from the cursor's rows, without an intermediate fetchall() list
             recordings = []
-            processed_count = 0
-        
-            for i, recording in enumerate(query_results):
-                try:
-                    logger.info(f"Processing recording {i+1}: ID={recording.id}")
-                
-                    recordings_manager.get_setup(recording)
-                
-                    directory = getattr(recording, 'directory', f"Recording_{recording.id}")
-                
-                    # Use safe attribute access - NO MORE 'created' attribute errors
-                    name = directory.split('\\')[-1] if directory else f"Recording {recording.id}"
-                    description = f"Recording from {directory}" if directory else f"Recording ID {recording.id}"
+            with self.acquire() as conn, conn.cursor() as cursor:
+                cursor.execute(RECORDINGS_QUERY)
+                for recording_id, directory in cursor:
+                    name = directory.split('\\')[-1] if directory else f"Recording {recording_id}"
+                    description = f"Recording from {directory}" if directory else f"Recording ID {recording_id}"
                 
-                    recording_info = {
-                        "Id": str(recording.id),
+                    recordings.append({
+                        "Id": str(recording_id),
                         "Endpoint": directory,
                         "Name": name,
                         "Description": description,
                         "CreatedDate": None  # Set to None since 'created' attribute doesn't exist
-                    }
-                
-                    recordings.append(recording_info)
-                    processed_count += 1
-                
-                    if processed_count <= 5:  # Only log details for first 5
-                        logger.info(f"✅ Processed recording {i+1}: {name}")
-                
-                except Exception as rec_ex:
-                    logger.error(f"❌ Error processing recording {i+1}: {rec_ex}")
-                    continue
+                    })
         
-            logger.info(f"Successfully processed {processed_count} out of {len(query_results)} recordings")
+            logger.info("Recordings query returned %d recordings", len(recordings))
+            self._recordings_cache = (time.monotonic() + RECORDINGS_CACHE_TTL, recordings)
             return recordings
             
         except Exception as e:
-            logger.error(f"Failed to get recordings: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            log_exception("Failed to get recordings", e)
             return []
     
 
@@ -498,20 +757,70 @@ class HorusMediaBridge:
 # Global bridge instance
 bridge = HorusMediaBridge()
 
+# Error keys of the routes the add-in deserializes into ApiResponse; the diagnostic routes use lower case
+ADDIN_ERROR_KEYS = ("Success", "Error")
+
+def json_errors(message, keys=("success", "error")):
+    """Route decorator that logs an unexpected exception and answers 500 with it as JSON"""
+    success_key, error_key = keys
+    
+    def decorator(route):
+        @functools.wraps(route)
+        def wrapper(*args, **kwargs):
+            try:
+                return route(*args, **kwargs)
+            except HTTPException as e:
+                # Client errors raised by Flask itself, such as a body that isn't valid JSON
+                return jsonify({
+                    success_key: False,
+                    error_key: e.description
+                }), e.code
+            except Exception as e:
+                log_exception(message, e)
+                return jsonify({
+                    success_key: False,
+                    error_key: str(e)
+                }), 500
+        return wrapper
+    return decorator
+
+# Flask-Compress appends the content coding to a strong ETag it compresses ("<tag>:br"),
+# so that is the form a compressing client sends back
+COMPRESSED_ETAG_SUFFIXES = ("", ":br", ":gzip")
+
+def matching_etag(etag):
+    """The form of etag the client sent in If-None-Match, with or without a coding suffix, or None"""
+    for suffix in COMPRESSED_ETAG_SUFFIXES:
+        if request.if_none_match.contains(etag + suffix):
+            return etag + suffix
+    return None
+
+# Parts of the health payload that cannot change while the server is running
+STATIC_HEALTH = {
+    "horus_modules_available": HORUS_AVAILABLE,
+    "connection_settings_available": CONNECTION_SETTINGS_AVAILABLE,
+    "python_version": sys.version,
+}
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Cheap liveness probe for polling clients"""
+    return '', 204
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint with detailed diagnostics"""
+    """Health check endpoint, with the configuration dump behind ?full=1"""
     try:
-        return jsonify({
+        health = {
+            **STATIC_HEALTH,
             "status": "running",
-            "timestamp": datetime.now().isoformat(),
             "horus_connected": bridge.is_connected,
-            "database_connected": bridge.db_connection is not None,
-            "horus_modules_available": HORUS_AVAILABLE,
-            "connection_settings_available": CONNECTION_SETTINGS_AVAILABLE,
-            "python_version": sys.version,
+            "database_connected": bridge.db_pool is not None,
             "successful_connection_method": bridge.connection_method,
-            "config": {
+        }
+        
+        if request.args.get('full'):
+            health["config"] = {
                 "db_host": bridge.db_config.get("host", "not set"),
                 "db_port": bridge.db_config.get("port", "not set"),
                 "db_database": bridge.db_config.get("database", "not set"),
@@ -521,7 +830,20 @@ def health_check():
                 "horus_host": bridge.horus_config.get("host", "not set"),
                 "horus_port": bridge.horus_config.get("port", "not set")
             }
-        })
+        
+        # The ETag covers the state but not the timestamp, so a poller whose view is
+        # current gets a bodiless 304
+        etag = hashlib.blake2b(app.json.dumps(health).encode(), digest_size=16).hexdigest()
+        sent_etag = matching_etag(etag)
+        if sent_etag:
+            response = app.response_class(status=304)
+            response.set_etag(sent_etag)
+        else:
+            health["timestamp"] = datetime.now().isoformat()
+            response = jsonify(health)
+            response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
     except Exception as e:
         logger.error(f"Health check error: {e}")
         return jsonify({
@@ -535,9 +857,8 @@ def connect():
     """Enhanced connect endpoint with detailed JSON transfer debugging"""
     try:
         data = request.json
-        logger.info("=" * 80)
-        logger.info("🔍 ENHANCED CONNECTION WITH JSON TRANSFER DEBUGGING")
-        logger.info("=" * 80)
+        # Banners are a single record; steps still log as they happen so a failure shows where it stopped
+        logger.info("🔍 ENHANCED CONNECTION WITH JSON TRANSFER DEBUGGING %s", "=" * 40)
         
         # Step 1: Debug what we received from C#
         logger.info("STEP 1: Analyzing data received from C# application...")
@@ -553,6 +874,27 @@ def connect():
                 }
             }), 400
         
+        # A client re-sending the settings it is already connected with gets the current
+        # state back instead of a rebuilt pool and a new Horus session
+        config_digest = hashlib.blake2b(app.json.dumps(data).encode(), digest_size=16).digest()
+        if bridge.db_pool and config_digest == bridge._connected_config:
+            if bridge.connections_alive():
+                logger.info("Configuration unchanged and already connected, skipping reconnect")
+                return jsonify({
+                    "success": True,
+                    "horus_connected": bridge.is_connected,
+                    "database_connected": True,
+                    "message": "Already connected with this configuration",
+                    "debug_info": {
+                        "password_test_passed": True,
+                        "connection_method": bridge.connection_method,
+                        "horus_modules_available": HORUS_AVAILABLE
+                    }
+                })
+            # Something dropped since the last connect, so go through the full reconnect
+            logger.info("Configuration unchanged but the connections are stale, reconnecting")
+            bridge._connected_config = None
+        
         # Step 2: Update configuration
         logger.info("STEP 2: Updating bridge configuration...")
         if data:
@@ -565,8 +907,8 @@ def connect():
                     "database_connected": False
                 }), 400
         
-        # Step 3: Test the received password immediately
-        logger.info("STEP 3: Testing received password immediately...")
+        # Step 3: Make sure a password was received
+        logger.info("STEP 3: Checking the received password...")
         received_password = bridge.db_config.get('password')
         
         if not received_password:
@@ -597,24 +939,8 @@ def connect():
                     }
                 }), 400
         
-        # Test the password immediately
-        password_works = bridge.test_received_password_immediately(received_password)
-        
-        if not password_works:
-            return jsonify({
-                "success": False,
-                "error": "Password received from C# application doesn't work",
-                "debug_info": {
-                    "password_length": len(received_password),
-                    "password_type": str(type(received_password)),
-                    "password_sample": f"{received_password[:2]}***{received_password[-2:]}",
-                    "contains_special_chars": any(c in received_password for c in '$%@#&*'),
-                    "troubleshooting": "The password was likely corrupted during JSON transfer from C#"
-                }
-            }), 400
-        
         # Step 4: Proceed with database connection
-        logger.info("STEP 4: Proceeding with database connection using verified password...")
+        logger.info("STEP 4: Proceeding with database connection...")
         
         # Check all required fields one more time
         required_fields = ['host', 'port', 'database', 'user', 'password']
@@ -628,10 +954,33 @@ def connect():
             }), 400
         
         # Now try the actual database connection
-        logger.info(f"Connecting to database: {bridge.db_config['user']}@{bridge.db_config['host']}:{bridge.db_config['port']}/{bridge.db_config['database']}")
+        logger.info(
+            "Connecting to database: %s@%s:%s/%s",
+            bridge.db_config['user'], bridge.db_config['host'], bridge.db_config['port'], bridge.db_config['database']
+        )
         
+        # Opening the pool authenticates, so a working password costs a single handshake;
+        # the separate test, with its transfer-corruption fixes, only runs when that fails
         db_success = bridge.connect_database()
-        logger.info(f"Database connection result: {'✅ SUCCESS' if db_success else '❌ FAILED'}")
+        password_works = db_success
+        if not db_success:
+            password_works = bridge.test_received_password_immediately(received_password)
+            
+            if not password_works:
+                return jsonify({
+                    "success": False,
+                    "error": "Password received from C# application doesn't work",
+                    "debug_info": {
+                        "password_length": len(received_password),
+                        "password_type": str(type(received_password)),
+                        "password_sample": f"{received_password[:2]}***{received_password[-2:]}",
+                        "contains_special_chars": any(c in received_password for c in '$%@#&*'),
+                        "troubleshooting": "The password was likely corrupted during JSON transfer from C#"
+                    }
+                }), 400
+            
+            db_success = bridge.connect_database()
+        logger.info("Database connection result: %s", '✅ SUCCESS' if db_success else '❌ FAILED')
         
         # Step 5: Try Horus connection if database succeeded
         horus_success = False
@@ -639,16 +988,17 @@ def connect():
             logger.info("STEP 5: Attempting Horus connection...")
             horus_url = bridge.horus_config.get('url')
             horus_success = bridge.connect_horus(horus_url)
-            logger.info(f"Horus connection result: {'SUCCESS' if horus_success else 'FAILED'}")
+            logger.info("Horus connection result: %s", 'SUCCESS' if horus_success else 'FAILED')
         else:
             logger.info("STEP 5: Skipping Horus connection (database failed or modules unavailable)")
         
+        if db_success and (horus_success or not HORUS_AVAILABLE):
+            bridge._connected_config = config_digest
+        
         # Final result
         result_message = f"Connection completed. Database: {'OK' if db_success else 'FAIL'}, Horus: {'OK' if horus_success else 'FAIL'}"
         
-        logger.info("=" * 80)
-        logger.info(f"FINAL RESULT: {result_message}")
-        logger.info("=" * 80)
+        logger.info("FINAL RESULT: %s %s", result_message, "=" * 40)
         
         return jsonify({
             "success": True,
@@ -662,15 +1012,21 @@ def connect():
             }
         })
         
+    except HTTPException as e:
+        # Unreadable or oversized request bodies keep their own status
+        return jsonify({
+            "success": False,
+            "error": e.description,
+            "debug_info": {}
+        }), e.code
     except Exception as e:
-        logger.error(f"Connection process failed: {e}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        log_exception("Connection process failed", e)
+        # The traceback only goes back to the caller when asked for with ?debug=1
+        debug_info = {"traceback": traceback.format_exc()[:500]} if request.args.get('debug') else {}
         return jsonify({
             "success": False,
             "error": str(e),
-            "debug_info": {
-                "traceback": traceback.format_exc()[:500]
-            }
+            "debug_info": debug_info
         }), 500
 
 @app.route('/debug-json', methods=['POST'])
@@ -762,6 +1118,35 @@ def debug_json_from_csharp():
             "error": str(e)
         }), 500
 
+# Seconds a successful /test-password check is reused for the same credentials
+PASSWORD_CHECK_TTL = 180
+
+# Per-process key for credential fingerprints, so the cache below never holds a password
+CREDENTIAL_SALT = os.urandom(32)
+
+# credential fingerprint -> (verified_at, connection_info) of passwords that worked
+verified_credentials = {}
+verified_credentials_lock = threading.Lock()
+
+def credential_fingerprint(host, port, database, user, password):
+    """Salted HMAC of a credential set, used as its key in verified_credentials"""
+    # "5432" and 5432 name the same server
+    try:
+        port = int(port)
+    except (TypeError, ValueError):
+        pass
+    message = "\0".join(str(part) for part in (host, port, database, user, password)).encode()
+    return hmac.new(CREDENTIAL_SALT, message, hashlib.sha256).digest()
+
+def remember_verified_credentials(fingerprint, connection_info):
+    """Cache a successful check, dropping every entry whose PASSWORD_CHECK_TTL has run out"""
+    now = time.monotonic()
+    with verified_credentials_lock:
+        expired = [key for key, (verified_at, _) in verified_credentials.items() if now - verified_at >= PASSWORD_CHECK_TTL]
+        for key in expired:
+            del verified_credentials[key]
+        verified_credentials[fingerprint] = (now, connection_info)
+
 @app.route('/test-password', methods=['POST'])
 def test_password_directly():
     """Test a password directly without going through the full connection process"""
@@ -784,36 +1169,59 @@ def test_password_directly():
         logger.info(f"Password length: {len(password)}")
         logger.info(f"Password sample: {password[:2]}***{password[-2:]}")
         
+        # A retry of credentials that just worked is answered without another handshake.
+        # Failures aren't kept, so a server that was briefly unreachable is tried again
+        fingerprint = credential_fingerprint(host, port, database, user, password)
+        cached = verified_credentials.get(fingerprint)
+        if cached and time.monotonic() - cached[0] < PASSWORD_CHECK_TTL:
+            logger.info("Password test SUCCESS (verified %.0fs ago)", time.monotonic() - cached[0])
+            return jsonify({
+                "success": True,
+                "message": "Password works correctly",
+                "connection_info": cached[1]
+            })
+        
+        # The open pool authenticated with the active settings, so re-testing exactly those
+        # borrows one of its connections; any other credentials get their own handshake
+        active = tuple(bridge.db_config.get(field) for field in ('host', 'port', 'database', 'user', 'password'))
+        uses_pool = bridge.db_pool is not None and (host, str(port), database, user, password) == (
+            active[0], str(active[1]), *active[2:]
+        )
+        
         try:
-            test_conn = psycopg2.connect(
-                host=host,
-                port=int(port),
-                database=database,
-                user=user,
-                password=password,
-                connect_timeout=10
-            )
+            if uses_pool:
+                connection = bridge.acquire()
+            else:
+                connection = contextlib.closing(psycopg2.connect(
+                    host=host,
+                    port=int(port),
+                    database=database,
+                    user=user,
+                    password=password,
+                    connect_timeout=10
+                ))
             
-            cursor = test_conn.cursor()
-            cursor.execute("SELECT current_user, current_database(), version()")
-            result = cursor.fetchone()
-            cursor.close()
-            test_conn.close()
+            with connection as test_conn, test_conn.cursor() as cursor:
+                cursor.execute("SELECT current_user, current_database(), version()")
+                result = cursor.fetchone()
             
             logger.info(f"Password test SUCCESS: {result[0]}@{result[1]}")
             
+            connection_info = {
+                "user": result[0],
+                "database": result[1],
+                "version": result[2][:50] + "..."
+            }
+            remember_verified_credentials(fingerprint, connection_info)
             return jsonify({
                 "success": True,
                 "message": "Password works correctly",
-                "connection_info": {
-                    "user": result[0],
-                    "database": result[1],
-                    "version": result[2][:50] + "..."
-                }
+                "connection_info": connection_info
             })
             
         except Exception as conn_error:
             logger.error(f"Password test FAILED: {conn_error}")
+            verified_credentials.pop(fingerprint, None)
             
             return jsonify({
                 "success": False,
@@ -860,6 +1268,28 @@ def test_database_connection():
         logger.info("ENHANCED DATABASE TEST STARTING")
         logger.info(f"Testing: {test_config['host']}:{test_config['port']}/{test_config['database']}")
         
+        # psycopg2 does its own handshake, so the network and service probes only run
+        # afterwards to explain a failure
+        db_info, conn_str, method_name = DatabaseConnectionDiagnostics.try_connection_methods(
+            test_config['host'], 
+            test_config['port'],
+            test_config['database'],
+            test_config['user'],
+            test_config['password']
+        )
+        
+        if db_info:
+            logger.info("Enhanced database test: SUCCESS")
+            
+            return jsonify({
+                "success": True,
+                "message": "Database connection successful",
+                "method": method_name,
+                "database": db_info[1],
+                "user": db_info[2],
+                "version": db_info[0][:100] + "..." if len(db_info[0]) > 100 else db_info[0]
+            })
+        
         network_ok, network_msg = DatabaseConnectionDiagnostics.test_network_connectivity(
             test_config['host'], test_config['port']
         )
@@ -882,37 +1312,11 @@ def test_database_connection():
                 "step_failed": "postgresql_service"
             }), 400
         
-        conn, conn_str, method_name = DatabaseConnectionDiagnostics.try_connection_methods(
-            test_config['host'], 
-            test_config['port'],
-            test_config['database'],
-            test_config['user'],
-            test_config['password']
-        )
-        
-        if conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT version(), current_database(), current_user")
-            db_info = cursor.fetchone()
-            cursor.close()
-            conn.close()
-            
-            logger.info("Enhanced database test: SUCCESS")
-            
-            return jsonify({
-                "success": True,
-                "message": "Database connection successful",
-                "method": method_name,
-                "database": db_info[1],
-                "user": db_info[2],
-                "version": db_info[0][:100] + "..." if len(db_info[0]) > 100 else db_info[0]
-            })
-        else:
-            return jsonify({
-                "success": False,
-                "error": "Authentication failed with all connection methods",
-                "step_failed": "authentication"
-            }), 400
+        return jsonify({
+            "success": False,
+            "error": "Authentication failed with all connection methods",
+            "step_failed": "authentication"
+        }), 400
         
     except Exception as e:
         logger.error(f"Enhanced database test failed: {e}")
@@ -923,157 +1327,299 @@ def test_database_connection():
         }), 500
 
 @app.route('/network-test', methods=['POST'])
+@json_errors("Network test failed")
 def network_test():
     """Network connectivity test endpoint"""
-    try:
-        data = request.json or {}
-        host = data.get('host', bridge.db_config.get('host', '10.0.10.100'))
-        port = data.get('port', bridge.db_config.get('port', '5432'))
-        
-        logger.info(f"Network test requested for {host}:{port}")
-        
-        network_ok, network_msg = DatabaseConnectionDiagnostics.test_network_connectivity(host, port)
-        service_ok, service_msg = DatabaseConnectionDiagnostics.test_postgresql_response(host, port)
-        
-        return jsonify({
-            "success": network_ok and service_ok,
-            "network_connectivity": {
-                "success": network_ok,
-                "message": network_msg
-            },
-            "postgresql_service": {
-                "success": service_ok,
-                "message": service_msg
-            },
-            "overall_status": "Ready for database connection" if (network_ok and service_ok) else "Network/Service issues detected"
-        })
-        
-    except Exception as e:
-        logger.error(f"Network test failed: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+    data = request.json or {}
+    host = data.get('host', bridge.db_config.get('host', '10.0.10.100'))
+    port = data.get('port', bridge.db_config.get('port', '5432'))
+    
+    logger.info(f"Network test requested for {host}:{port}")
+    
+    network_ok, network_msg = DatabaseConnectionDiagnostics.test_network_connectivity(host, port)
+    service_ok, service_msg = DatabaseConnectionDiagnostics.test_postgresql_response(host, port)
+    
+    return jsonify({
+        "success": network_ok and service_ok,
+        "network_connectivity": {
+            "success": network_ok,
+            "message": network_msg
+        },
+        "postgresql_service": {
+            "success": service_ok,
+            "message": service_msg
+        },
+        "overall_status": "Ready for database connection" if (network_ok and service_ok) else "Network/Service issues detected"
+    })
 
 @app.route('/recordings', methods=['GET'])
+@json_errors("Failed to get recordings", ADDIN_ERROR_KEYS)
 def get_recordings():
     """FIXED: Get list of available recordings - removed self parameter"""
-    try:
-        return jsonify({
+    recordings = bridge.get_recordings(refresh=bool(request.args.get('refresh')))
+    
+    # While the bridge hands back the same cached list, its serialized body and ETag are reused
+    cached = bridge._recordings_response
+    if cached is None or cached[0] is not recordings:
+        response = jsonify({
             "Success": True,
-            "Data": bridge.get_recordings(),
+            "Data": recordings,
             "Message": f"Retrieved recordings successfully"
         })
-        
-    except Exception as e:
-        logger.error(f"Failed to get recordings: {e}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return jsonify({
-            "Success": False,
-            "Error": str(e)
-        }), 500
+        response.add_etag()
+        cached = (recordings, response.get_data(), response.get_etag()[0])
+        bridge._recordings_response = cached
+    
+    sent_etag = matching_etag(cached[2])
+    if sent_etag:
+        response = app.response_class(status=304)
+        response.set_etag(sent_etag)
+    else:
+        response = app.response_class(cached[1], mimetype=app.json.mimetype)
+        response.set_etag(cached[2])
+    # The list can change, so clients revalidate each time but get a bodiless 304 when it hasn't
+    response.cache_control.no_cache = True
+    return response
 
-@app.route('/images', methods=['POST'])
-def get_images():
-    """Get images from a recording - FIXED to handle BytesIO return from get_image"""
+def image_to_bytes(image_data):
+    """JPEG bytes from what get_image() returned (BytesIO, bytes or PIL Image)"""
+    if isinstance(image_data, bytes):
+        return image_data
+    if isinstance(image_data, io.BytesIO):
+        # A view of the buffer, not a copy of it
+        return image_data.getbuffer()
+    if hasattr(image_data, 'save'):
+        return bridge.encode_jpeg(image_data)
+    if hasattr(image_data, 'getvalue'):
+        return image_data.getvalue()
+    raise TypeError(f"Cannot encode image data of type {type(image_data)}")
+
+def image_to_base64(image_data):
+    """Base64-encode what get_image() returned (BytesIO, bytes or PIL Image)"""
+    return base64.b64encode(image_to_bytes(image_data)).decode('utf-8')
+
+def fetch_frame_image(recording, frame, i, width, height, encode=image_to_base64):
+    """Acquire and encode one frame's image, returning the response entry or None"""
     try:
-        if not HORUS_AVAILABLE:
-            return jsonify({
-                "Success": False,
-                "Error": "Horus modules are not available"
-            }), 503
-            
-        data = request.json
-        logger.info(f"Received image request: {data}")
+        sp_camera = bridge.get_camera()
         
-        recording_endpoint = data.get('recording_endpoint', 'Rotterdam360\\Ladybug5plus')
-        count = data.get('count', 20) 
-        width = data.get('width', 1920)
-        height = data.get('height', 1080)
+        # Set frame and acquire spherical image
+        sp_camera.set_frame(recording, frame)
+        spherical_image = sp_camera.acquire(Size(width, height), manual_fetch=False)
         
-        logger.info(f"Getting images from recording: {recording_endpoint}")
+        if spherical_image is None:
+            logger.error(f"Failed to acquire image for frame {i+1}: SphericalImage is None")
+            return None
         
-        if not bridge.client or not bridge.is_connected or not bridge.db_connection:
-            return jsonify({
-                "Success": False,
-                "Error": "Not connected to Horus server or database"
-            }), 500
+        image_data = spherical_image.get_image()
+        logger.info("get_image() returned type: %s", type(image_data))
         
-        recordings = Recordings(bridge.db_connection)
+        image = {
+            "Index": i,
+            "Data": encode(image_data),
+            "Format": "image/jpeg",
+            "Timestamp": frame.timestamp.isoformat() if hasattr(frame, 'timestamp') and frame.timestamp else None
+        }
         
-        # Try different approaches to find the recording
-        recording = None
-        search_attempts = []
+        logger.info("Successfully processed frame %d", i + 1)
+        return image
         
-        # Method 1: Try with the endpoint as-is (full path)
+    except Exception as frame_ex:
+        log_exception(f"Failed to process frame {i+1}", frame_ex)
+        return None
+
+def find_recording(recordings, recording_endpoint):
+    """Find a recording by endpoint, trying looser matches in turn; returns (recording, search_attempts)"""
+    # Try different approaches to find the recording
+    recording = None
+    search_attempts = []
+    
+    # Method 1: Try with the endpoint as-is (full path)
+    try:
+        logger.info("Trying directory_like with full path: %s", recording_endpoint)
+        recording = next(Recording.query(recordings, directory_like=recording_endpoint), None)
+        if recording:
+            search_attempts.append(f"SUCCESS: Full path '{recording_endpoint}'")
+        else:
+            search_attempts.append(f"FAILED: Full path '{recording_endpoint}'")
+    except Exception as e:
+        search_attempts.append(f"ERROR: Full path '{recording_endpoint}' - {e}")
+    
+    # Method 2: Try with just the directory name
+    if not recording:
         try:
-            logger.info(f"Trying directory_like with full path: {recording_endpoint}")
-            recording = next(Recording.query(recordings, directory_like=recording_endpoint), None)
+            dir_name = recording_endpoint.split('\\')[-1]
+            logger.info("Trying directory_like with dir name: %s", dir_name)
+            recording = next(Recording.query(recordings, directory_like=dir_name), None)
             if recording:
-                search_attempts.append(f"SUCCESS: Full path '{recording_endpoint}'")
+                search_attempts.append(f"SUCCESS: Directory name '{dir_name}'")
             else:
-                search_attempts.append(f"FAILED: Full path '{recording_endpoint}'")
+                search_attempts.append(f"FAILED: Directory name '{dir_name}'")
         except Exception as e:
-            search_attempts.append(f"ERROR: Full path '{recording_endpoint}' - {e}")
-        
-        # Method 2: Try with just the directory name
-        if not recording:
-            try:
-                dir_name = recording_endpoint.split('\\')[-1]
-                logger.info(f"Trying directory_like with dir name: {dir_name}")
-                recording = next(Recording.query(recordings, directory_like=dir_name), None)
-                if recording:
-                    search_attempts.append(f"SUCCESS: Directory name '{dir_name}'")
-                else:
-                    search_attempts.append(f"FAILED: Directory name '{dir_name}'")
-            except Exception as e:
-                search_attempts.append(f"ERROR: Directory name '{dir_name}' - {e}")
-        
-        # Method 3: Try with double backslashes
-        if not recording:
-            try:
-                double_slash_endpoint = recording_endpoint.replace('\\', '\\\\')
-                logger.info(f"Trying with double backslashes: {double_slash_endpoint}")
-                recording = next(Recording.query(recordings, directory_like=double_slash_endpoint), None)
-                if recording:
-                    search_attempts.append(f"SUCCESS: Double backslashes '{double_slash_endpoint}'")
-                else:
-                    search_attempts.append(f"FAILED: Double backslashes '{double_slash_endpoint}'")
-            except Exception as e:
-                search_attempts.append(f"ERROR: Double backslashes '{double_slash_endpoint}' - {e}")
-        
-        # Method 4: Try partial matching
+            search_attempts.append(f"ERROR: Directory name '{dir_name}' - {e}")
+    
+    # Method 3: Try with double backslashes
+    if not recording:
+        try:
+            double_slash_endpoint = recording_endpoint.replace('\\', '\\\\')
+            logger.info("Trying with double backslashes: %s", double_slash_endpoint)
+            recording = next(Recording.query(recordings, directory_like=double_slash_endpoint), None)
+            if recording:
+                search_attempts.append(f"SUCCESS: Double backslashes '{double_slash_endpoint}'")
+            else:
+                search_attempts.append(f"FAILED: Double backslashes '{double_slash_endpoint}'")
+        except Exception as e:
+            search_attempts.append(f"ERROR: Double backslashes '{double_slash_endpoint}' - {e}")
+    
+    # Method 4: Try partial matching
+    if not recording:
+        try:
+            logger.info("Trying partial matching...")
+            all_recordings = list(Recording.query(recordings))
+            target_name = recording_endpoint.split('\\')[-1].lower()
+            
+            for rec in all_recordings:
+                try:
+                    recordings.get_setup(rec)
+                    if hasattr(rec, 'directory') and rec.directory:
+                        rec_name = rec.directory.split('\\')[-1].lower()
+                        if target_name in rec_name or rec_name in target_name:
+                            recording = rec
+                            search_attempts.append(f"SUCCESS: Partial match '{target_name}' -> '{rec.directory}'")
+                            break
+                except Exception as setup_ex:
+                    continue
+            
+            if not recording:
+                search_attempts.append(f"FAILED: Partial matching for '{target_name}'")
+        except Exception as e:
+            search_attempts.append(f"ERROR: Partial matching - {e}")
+    
+    logger.info("Recording search attempts:")
+    for attempt in search_attempts:
+        logger.info("  %s", attempt)
+    
+    return recording, search_attempts
+
+# Endpoints whose recordings resolve_recording keeps
+RECORDING_CACHE_SIZE = 256
+
+class RecordingNotFound(LookupError):
+    """No recording matched an endpoint; carries the search attempts for the 404 response"""
+    
+    def __init__(self, recording_endpoint, search_attempts):
+        super().__init__(f"No recording found for endpoint: {recording_endpoint}")
+        self.search_attempts = search_attempts
+
+@functools.lru_cache(maxsize=RECORDING_CACHE_SIZE)
+def resolve_recording(recording_endpoint):
+    """Find and set up the recording for an endpoint, remembering it per endpoint"""
+    # Misses raise rather than return None so they aren't cached and a recording added
+    # later is still found. The Recording is cached rather than its id because set_frame
+    # needs the object; it holds no connection, the managers do
+    with bridge.acquire() as conn:
+        recordings, _ = bridge.get_managers(conn)
+        recording, search_attempts = find_recording(recordings, recording_endpoint)
         if not recording:
-            try:
-                logger.info("Trying partial matching...")
-                all_recordings = list(Recording.query(recordings))
-                target_name = recording_endpoint.split('\\')[-1].lower()
-                
-                for rec in all_recordings:
-                    try:
-                        recordings.get_setup(rec)
-                        if hasattr(rec, 'directory') and rec.directory:
-                            rec_name = rec.directory.split('\\')[-1].lower()
-                            if target_name in rec_name or rec_name in target_name:
-                                recording = rec
-                                search_attempts.append(f"SUCCESS: Partial match '{target_name}' -> '{rec.directory}'")
-                                break
-                    except Exception as setup_ex:
-                        continue
-                
-                if not recording:
-                    search_attempts.append(f"FAILED: Partial matching for '{target_name}'")
-            except Exception as e:
-                search_attempts.append(f"ERROR: Partial matching - {e}")
-        
-        logger.info("Recording search attempts:")
-        for attempt in search_attempts:
-            logger.info(f"  {attempt}")
+            raise RecordingNotFound(recording_endpoint, search_attempts)
+        recordings.get_setup(recording)
+    return recording
+
+def load_frames(conn, frames, recording, count):
+    """Load the first count frames of a recording as (position, Frame) pairs"""
+    # LIMIT in SQL, so only count rows leave the server however long the recording is
+    cursor = conn.cursor()
+    cursor.execute(FIRST_FRAMES_QUERY, (recording.id, int(count)))
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    
+    logger.info("Found %d frames for processing", len(indexes))
+    
+    # All database work for a request happens here; the image fetches don't touch it
+    frame_list = []
+    for i, index in enumerate(indexes):
+        try:
+            logger.info("Processing frame %d/%d: index %s", i + 1, len(indexes), index)
+            frame = next(Frame.query(frames, recordingid=recording.id, index=index, order_by="index"), None)
+            
+            if frame is None:
+                logger.warning(f"Frame {i+1} is None, skipping")
+                continue
+            
+            frame_list.append((i, frame))
+        except Exception as frame_ex:
+            logger.error(f"Failed to load frame {i+1}: {frame_ex}")
+    
+    return frame_list
+
+# Fields of an /images or /images/stream request body and their defaults
+IMAGES_REQUEST_DEFAULTS = {
+    "recording_endpoint": 'Rotterdam360\\Ladybug5plus',
+    "count": 20,
+    "width": 1920,
+    "height": 1080,
+}
+
+# Most frames one /images request may ask for
+MAX_IMAGE_COUNT = 100
+
+def parse_images_request(data):
+    """Check an /images request body, returning (recording_endpoint, count, width, height) or raising ValueError"""
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    
+    unknown = set(data) - IMAGES_REQUEST_DEFAULTS.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    
+    values = {**IMAGES_REQUEST_DEFAULTS, **data}
+    if not isinstance(values["recording_endpoint"], str) or not values["recording_endpoint"]:
+        raise ValueError("recording_endpoint must be a non-empty string")
+    for field in ("count", "width", "height"):
+        # bool is an int subclass, but true/false is never a valid size
+        if not isinstance(values[field], int) or isinstance(values[field], bool) or values[field] < 1:
+            raise ValueError(f"{field} must be a positive integer")
+    if values["count"] > MAX_IMAGE_COUNT:
+        raise ValueError(f"count must be at most {MAX_IMAGE_COUNT}")
+    
+    return values["recording_endpoint"], values["count"], values["width"], values["height"]
+
+@app.route('/images', methods=['POST'])
+@json_errors("Failed to get images", ADDIN_ERROR_KEYS)
+def get_images():
+    """Get images from a recording - FIXED to handle BytesIO return from get_image"""
+    if not HORUS_AVAILABLE:
+        return Response(HORUS_UNAVAILABLE_BODY, status=503, mimetype="application/json")
         
-        if not recording:
-            logger.error(f"No recording found after all search methods")
-            try:
-                logger.info("Available recordings (first 10):")
+    data = request.json
+    logger.info("Received image request: %s", data)
+    
+    try:
+        recording_endpoint, count, width, height = parse_images_request(data)
+    except ValueError as invalid:
+        return jsonify({
+            "Success": False,
+            "Error": str(invalid)
+        }), 400
+    
+    logger.info("Getting images from recording: %s", recording_endpoint)
+    
+    if not bridge.client or not bridge.is_connected or not bridge.db_pool:
+        return jsonify({
+            "Success": False,
+            "Error": "Not connected to Horus server or database"
+        }), 500
+    
+    try:
+        recording = resolve_recording(recording_endpoint)
+    except RecordingNotFound as not_found:
+        logger.error(f"No recording found after all search methods")
+        try:
+            logger.info("Available recordings (first 10):")
+            with bridge.acquire() as conn:
+                recordings, _ = bridge.get_managers(conn)
                 all_recordings = list(Recording.query(recordings))
                 for i, rec in enumerate(all_recordings[:10]):
                     try:
@@ -1082,299 +1628,457 @@ def get_images():
                         logger.info(f"  [{i+1}] ID={rec.id}: {directory}")
                     except:
                         logger.info(f"  [{i+1}] ID={rec.id}: <setup failed>")
-                if len(all_recordings) > 10:
-                    logger.info(f"  ... and {len(all_recordings) - 10} more")
-            except Exception as debug_ex:
-                logger.error(f"Failed to list recordings: {debug_ex}")
-            
-            return jsonify({
-                "Success": False,
-                "Error": f"No recording found for endpoint: {recording_endpoint}",
-                "Debug": {
-                    "search_attempts": search_attempts,
-                    "endpoint_received": recording_endpoint
-                }
-            }), 404
-        
-        recordings.get_setup(recording)
-        logger.info(f"Found recording: {recording} -> {recording.directory}")
-        logger.info(f"Recording setup: {getattr(recording, 'setup', 'No setup info')}")
-        
-        # Create spherical camera exactly like standalone script
-        sp_camera = SphericalCamera()
-        sp_camera.set_network_client(bridge.client)
-        sp_camera.set_horizontal_fov(90)  # Default value
-        sp_camera.set_yaw(0)
-        sp_camera.set_pitch(-30)
-        
-        # Get frames exactly like standalone script
-        frames = Frames(bridge.db_connection)
-        temp = Frame.query(frames, recordingid=recording.id, order_by="index")
-        temp = list(itertools.islice(temp, int(count)))
-        
-        logger.info(f"Found {len(temp)} frames for processing")
-        
-        if len(temp) == 0:
-            logger.warning("No frames found for this recording")
-            return jsonify({
-                "Success": True,
-                "Data": [],
-                "Message": "No frames found for this recording"
-            })
-        
-        processed_images = []
-        
-        # Process each frame
-        for i, t in enumerate(temp):
-            try:
-                logger.info(f"Processing frame {i+1}/{len(temp)}: {t}")
-                
-                results = Frame.query(frames, recordingid=t.recordingid, index=t.index, order_by="index")
-                frame = next(results)
-                
-                logger.info(f"Got frame: {frame}")
-                
-                if frame is None:
-                    logger.warning(f"Frame {i+1} is None, skipping")
-                    continue
-                
-                logger.info(f"Frame location: {frame.get_location() if hasattr(frame, 'get_location') else 'No location method'}")
-                
-                # Set frame and acquire spherical image
-                sp_camera.set_frame(recording, frame)
-                spherical_image = sp_camera.acquire(Size(width, height), manual_fetch=False)
-                
-                if spherical_image is None:
-                    logger.error(f"Failed to acquire image for frame {i+1}: SphericalImage is None")
-                    continue
-                
-                # FIXED: Handle different return types from get_image()
-                try:
-                    image_data = spherical_image.get_image()
-                    logger.info(f"get_image() returned type: {type(image_data)}")
-                    
-                    # If get_image() returns BytesIO, use it directly
-                    if isinstance(image_data, io.BytesIO):
-                        logger.info(f"get_image() returned BytesIO, using directly")
-                        image_data.seek(0)  # Make sure we're at the beginning
-                        image_bytes = image_data.getvalue()
-                        
-                        # Convert to base64
-                        image_b64 = base64.b64encode(image_bytes).decode('utf-8')
-                        
-                        processed_images.append({
-                            "Index": i,
-                            "Data": image_b64,
-                            "Format": "image/jpeg",
-                            "Timestamp": frame.timestamp.isoformat() if hasattr(frame, 'timestamp') and frame.timestamp else None
-                        })
-                        
-                        logger.info(f"Successfully processed frame {i+1} (BytesIO direct)")
-                    
-                    # If get_image() returns bytes, use directly
-                    elif isinstance(image_data, bytes):
-                        logger.info(f"get_image() returned bytes, using directly")
-                        image_b64 = base64.b64encode(image_data).decode('utf-8')
-                        
-                        processed_images.append({
-                            "Index": i,
-                            "Data": image_b64,
-                            "Format": "image/jpeg", 
-                            "Timestamp": frame.timestamp.isoformat() if hasattr(frame, 'timestamp') and frame.timestamp else None
-                        })
-                        
-                        logger.info(f"Successfully processed frame {i+1} (bytes direct)")
-                    
-                    # If get_image() returns PIL Image, convert to bytes
-                    elif hasattr(image_data, 'save'):  # PIL Image check
-                        logger.info(f"get_image() returned PIL Image, converting to bytes")
-                        buffer = io.BytesIO()
-                        image_data.save(buffer, format="JPEG", quality=95)
-                        image_bytes = buffer.getvalue()
-                        image_b64 = base64.b64encode(image_bytes).decode('utf-8')
-                        
-                        processed_images.append({
-                            "Index": i,
-                            "Data": image_b64,
-                            "Format": "image/jpeg",
-                            "Timestamp": frame.timestamp.isoformat() if hasattr(frame, 'timestamp') and frame.timestamp else None
-                        })
-                        
-                        logger.info(f"Successfully processed frame {i+1} (PIL Image)")
-                    
-                    # Unknown return type - try to debug
-                    else:
-                        logger.error(f"Unknown return type from get_image(): {type(image_data)}")
-                        logger.error(f"Available methods: {[method for method in dir(image_data) if not method.startswith('_')]}")
-                        
-                        # Try to see if it has image data we can use
-                        if hasattr(image_data, 'getvalue'):
-                            logger.info("Trying getvalue() method")
-                            try:
-                                image_bytes = image_data.getvalue()
-                                image_b64 = base64.b64encode(image_bytes).decode('utf-8')
-                                processed_images.append({
-                                    "Index": i,
-                                    "Data": image_b64,
-                                    "Format": "image/jpeg",
-                                    "Timestamp": frame.timestamp.isoformat() if hasattr(frame, 'timestamp') and frame.timestamp else None
-                                })
-                                logger.info(f"Successfully processed frame {i+1} (via getvalue)")
-                            except Exception as getval_ex:
-                                logger.error(f"getvalue() failed: {getval_ex}")
-                                continue
-                        else:
-                            logger.error(f"Cannot process unknown image data type: {type(image_data)}")
-                            continue
-                
-                except AttributeError as ae:
-                    logger.error(f"Failed to get image from SphericalImage: {ae}")
-                    logger.error(f"Available SphericalImage methods: {[method for method in dir(spherical_image) if not method.startswith('_')]}")
-                    continue
-                
-                except Exception as img_ex:
-                    logger.error(f"Error processing image data: {img_ex}")
-                    logger.error(f"Image data type: {type(image_data) if 'image_data' in locals() else 'undefined'}")
-                    continue
-                
-            except Exception as frame_ex:
-                logger.error(f"Failed to process frame {i+1}: {frame_ex}")
-                logger.error(f"Frame processing traceback: {traceback.format_exc()}")
-                continue
-        
-        logger.info(f"Successfully processed {len(processed_images)} out of {len(temp)} frames")
+            if len(all_recordings) > 10:
+                logger.info(f"  ... and {len(all_recordings) - 10} more")
+        except Exception as debug_ex:
+            logger.error(f"Failed to list recordings: {debug_ex}")
         
+        return jsonify({
+            "Success": False,
+            "Error": str(not_found),
+            "Debug": {
+                "search_attempts": not_found.search_attempts,
+                "endpoint_received": recording_endpoint
+            }
+        }), 404
+    
+    logger.info("Found recording: %s -> %s", recording, recording.directory)
+    logger.info("Recording setup: %s", getattr(recording, 'setup', 'No setup info'))
+    
+    with bridge.acquire() as conn:
+        _, frames = bridge.get_managers(conn)
+        frame_list = load_frames(conn, frames, recording, count)
+    
+    if not frame_list:
+        logger.warning("No frames found for this recording")
         return jsonify({
             "Success": True,
-            "Data": processed_images,
-            "Message": f"Retrieved {len(processed_images)} images from recording {recording.directory}"
+            "Data": [],
+            "Message": "No frames found for this recording"
         })
-        
-    except Exception as e:
-        logger.error(f"Failed to get images: {e}")
-        logger.error(f"Full traceback: {traceback.format_exc()}")
+    
+    # Each image is an independent request to the Horus server, so fetch them side by side
+    futures = [
+        image_executor.submit(fetch_frame_image, recording, frame, i, width, height)
+        for i, frame in frame_list
+    ]
+    
+    # Clients that ask for NDJSON get each image on its own line as soon as it is ready,
+    # instead of one body holding every base64 image at once
+    if request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE:
+        def generate():
+            sent = 0
+            for future in futures:
+                image = future.result()
+                if image:
+                    sent += 1
+                    yield (app.json.dumps(image) + "\n").encode()
+            logger.info("Streamed %d out of %d frames", sent, len(frame_list))
+        
+        response = Response(generate(), mimetype=NDJSON_MIMETYPE)
+        response.direct_passthrough = True
+        return response
+    
+    processed_images = [image for image in (future.result() for future in futures) if image]
+    
+    logger.info("Successfully processed %d out of %d frames", len(processed_images), len(frame_list))
+    
+    return jsonify({
+        "Success": True,
+        "Data": processed_images,
+        "Message": f"Retrieved {len(processed_images)} images from recording {recording.directory}"
+    })
+
+# Separates the JPEG parts of a /images/stream response
+STREAM_BOUNDARY = "horus-frame"
+
+@app.route('/images/stream', methods=['POST'])
+@json_errors("Failed to stream images", ADDIN_ERROR_KEYS)
+def stream_images():
+    """Stream images from a recording as raw JPEG parts of a multipart/mixed response"""
+    if not HORUS_AVAILABLE:
+        return Response(HORUS_UNAVAILABLE_BODY, status=503, mimetype="application/json")
+    
+    try:
+        recording_endpoint, count, width, height = parse_images_request(request.json)
+    except ValueError as invalid:
+        return jsonify({
+            "Success": False,
+            "Error": str(invalid)
+        }), 400
+    
+    logger.info("Streaming images from recording: %s", recording_endpoint)
+    
+    if not bridge.client or not bridge.is_connected or not bridge.db_pool:
         return jsonify({
             "Success": False,
-            "Error": str(e)
+            "Error": "Not connected to Horus server or database"
         }), 500
-
-@app.route('/disconnect', methods=['POST'])
-def disconnect():
-    """Disconnect from services"""
+    
     try:
-        disconnected_services = []
-        
-        if bridge.client:
-            bridge.client = None
-            bridge.is_connected = False
-            disconnected_services.append("Horus")
-            logger.info("Disconnected from Horus")
-        
-        if bridge.db_connection:
-            bridge.db_connection.close()
-            bridge.db_connection = None
-            bridge.connection_string = None
-            bridge.connection_method = None
-            disconnected_services.append("Database")
-            logger.info("Disconnected from Database")
-        
-        message = f"Disconnected from: {', '.join(disconnected_services)}" if disconnected_services else "No active connections to disconnect"
-        logger.info(message)
-        
+        recording = resolve_recording(recording_endpoint)
+    except RecordingNotFound as not_found:
         return jsonify({
-            "success": True,
-            "message": message
-        })
-        
-    except Exception as e:
-        logger.error(f"Disconnect failed: {e}")
+            "Success": False,
+            "Error": str(not_found),
+            "Debug": {
+                "search_attempts": not_found.search_attempts,
+                "endpoint_received": recording_endpoint
+            }
+        }), 404
+    
+    with bridge.acquire() as conn:
+        _, frames = bridge.get_managers(conn)
+        frame_list = load_frames(conn, frames, recording, count)
+    
+    # Start every fetch now; parts are written in frame order as each one finishes
+    futures = [
+        image_executor.submit(fetch_frame_image, recording, frame, i, width, height, image_to_bytes)
+        for i, frame in frame_list
+    ]
+    
+    def generate():
+        for future in futures:
+            image = future.result()
+            if image is None:
+                continue
+            
+            headers = f"--{STREAM_BOUNDARY}\r\nContent-Type: image/jpeg\r\nX-Index: {image['Index']}\r\n"
+            if image["Timestamp"]:
+                headers += f"X-Timestamp: {image['Timestamp']}\r\n"
+            yield (headers + "\r\n").encode('ascii')
+            yield bytes(image["Data"])
+            yield b"\r\n"
+        yield f"--{STREAM_BOUNDARY}--\r\n".encode('ascii')
+    
+    response = Response(generate(), mimetype=f"multipart/mixed; boundary={STREAM_BOUNDARY}")
+    # The parts are already bytes; let the server write them out as they come
+    response.direct_passthrough = True
+    return response
+
+# The frames just before and just after the target time; each half is a single
+# index seek when frames has an index on (recordingid, timestamp)
+# The distance is computed by PostgreSQL, which already reconciles a naive or
+# zone-qualified target with the column's type for the comparisons; subtracting
+# in Python fails when only one side is timezone-aware
+NEAREST_FRAME_QUERY = """
+    (SELECT "index", timestamp, abs(extract(epoch FROM timestamp - %(target)s)) FROM frames
+     WHERE recordingid = %(recording_id)s AND timestamp <= %(target)s
+     ORDER BY timestamp DESC LIMIT 1)
+    UNION ALL
+    (SELECT "index", timestamp, abs(extract(epoch FROM timestamp - %(target)s)) FROM frames
+     WHERE recordingid = %(recording_id)s AND timestamp >= %(target)s
+     ORDER BY timestamp ASC LIMIT 1)
+"""
+
+# Total JPEG bytes GET /image keeps in memory across (recording, frame, size) combinations
+IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+def lru_cache_by_size(max_bytes, size_of, key=lambda *args: args):
+    """Like functools.lru_cache, but evicting least recently used results once their total size_of() passes max_bytes"""
+    def decorator(func):
+        cache = collections.OrderedDict()  # key(*args) -> result, least recently used first
+        lock = threading.Lock()
+        total = 0
+        
+        @functools.wraps(func)
+        def wrapper(*args):
+            nonlocal total
+            cache_key = key(*args)
+            with lock:
+                if cache_key in cache:
+                    cache.move_to_end(cache_key)
+                    return cache[cache_key]
+            
+            # Computed outside the lock so a slow miss doesn't hold up hits
+            result = func(*args)
+            size = size_of(result)
+            if size > max_bytes:
+                return result
+            
+            with lock:
+                if cache_key not in cache:
+                    cache[cache_key] = result
+                    total += size
+                    while total > max_bytes:
+                        _, evicted = cache.popitem(last=False)
+                        total -= size_of(evicted)
+            return result
+        
+        def cache_clear():
+            nonlocal total
+            with lock:
+                cache.clear()
+                total = 0
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+class ImageUnavailable(LookupError):
+    """No image could be produced for a GET /image request; carries the status to answer with"""
+    
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+@lru_cache_by_size(
+    IMAGE_CACHE_BYTES,
+    lambda image: len(image["Data"]),
+    key=lambda recording, index, width, height: (recording.id, index, width, height)
+)
+def frame_image(recording, index, width, height):
+    """JPEG image entry for one frame of a recording, remembered per frame and size"""
+    # A frame's image never changes, so every timestamp that lands on it shares one
+    # entry. Failures raise rather than return, which keeps them out of the cache
+    with bridge.acquire() as conn:
+        _, frames = bridge.get_managers(conn)
+        frame = next(Frame.query(frames, recordingid=recording.id, index=index), None)
+    
+    if frame is None:
+        raise ImageUnavailable(f"Frame {index} could not be loaded", 404)
+    
+    image = fetch_frame_image(recording, frame, index, width, height, image_to_bytes)
+    if image is None:
+        raise ImageUnavailable(f"Failed to acquire image for frame {index}", 500)
+    
+    # Own the bytes; a view would keep the camera's whole buffer alive in the cache
+    image["Data"] = bytes(image["Data"])
+    return image
+
+def nearest_frame_image(recording_endpoint, target_time, width, height):
+    """JPEG of the frame nearest target_time as (image entry, recording directory)"""
+    recording = resolve_recording(recording_endpoint)
+    
+    with bridge.acquire() as conn:
+        cursor = conn.cursor()
+        cursor.execute(NEAREST_FRAME_QUERY, {"recording_id": recording.id, "target": target_time})
+        candidates = cursor.fetchall()
+        cursor.close()
+    
+    if not candidates:
+        raise ImageUnavailable(f"No frames found for recording: {recording_endpoint}", 404)
+    
+    index, frame_time, _ = min(candidates, key=lambda row: row[2])
+    logger.info("Nearest frame: index %s at %s", index, frame_time)
+    
+    return frame_image(recording, index, width, height), recording.directory
+
+@app.route('/image/<path:recording_endpoint>/<timestamp>', methods=['GET'])
+@json_errors("Failed to get image by timestamp", ADDIN_ERROR_KEYS)
+def get_image_by_timestamp(recording_endpoint, timestamp):
+    """Get the image from the frame closest to a timestamp"""
+    if not HORUS_AVAILABLE:
+        return Response(HORUS_UNAVAILABLE_BODY, status=503, mimetype="application/json")
+    
+    if not bridge.client or not bridge.is_connected or not bridge.db_pool:
         return jsonify({
-            "success": False,
-            "error": str(e)
+            "Success": False,
+            "Error": "Not connected to Horus server or database"
         }), 500
+    
+    try:
+        target_time = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return jsonify({
+            "Success": False,
+            "Error": f"Invalid timestamp: {timestamp}"
+        }), 400
+    
+    # Same rule as /images; the size goes to Horus and is part of the image cache key
+    try:
+        width = int(request.args.get('width', 600))
+        height = int(request.args.get('height', 600))
+        if width < 1 or height < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({
+            "Success": False,
+            "Error": "width and height must be positive integers"
+        }), 400
+    # The JPEG itself by default; ?format=json for the base64 envelope
+    as_json = request.args.get('format') == 'json'
+    
+    # The image for an endpoint, time and size never changes, so a client that
+    # already has it is answered before any database or Horus work
+    etag = hashlib.blake2b(f"{recording_endpoint}|{timestamp}|{width}|{height}|{as_json}".encode(), digest_size=16).hexdigest()
+    sent_etag = matching_etag(etag)
+    if sent_etag:
+        not_modified = Response(status=304)
+        not_modified.set_etag(sent_etag)
+        return not_modified
+    
+    logger.info("Getting image nearest %s from recording: %s", timestamp, recording_endpoint)
+    
+    try:
+        image, directory = nearest_frame_image(recording_endpoint, target_time, width, height)
+    except RecordingNotFound as not_found:
+        return jsonify({
+            "Success": False,
+            "Error": str(not_found)
+        }), 404
+    except ImageUnavailable as unavailable:
+        return jsonify({
+            "Success": False,
+            "Error": str(unavailable)
+        }), unavailable.status
+    
+    if as_json:
+        response = jsonify({
+            "Success": True,
+            "Data": {**image, "Data": base64.b64encode(image["Data"]).decode('utf-8')},
+            "Message": f"Retrieved image for frame {image['Index']} from recording {directory}"
+        })
+    else:
+        # Same frame headers as the /images/stream parts
+        response = Response(image["Data"], mimetype="image/jpeg")
+        response.headers["X-Index"] = str(image["Index"])
+        if image["Timestamp"]:
+            response.headers["X-Timestamp"] = image["Timestamp"]
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = IMAGE_CACHE_MAX_AGE
+    return response
+
+@app.route('/disconnect', methods=['POST'])
+@json_errors("Disconnect failed")
+def disconnect():
+    """Disconnect from services"""
+    disconnected_services = []
+    
+    if bridge.client:
+        bridge.client = None
+        bridge.is_connected = False
+        disconnected_services.append("Horus")
+        logger.info("Disconnected from Horus")
+    
+    if bridge.db_pool:
+        bridge.close_database()
+        bridge.connection_string = None
+        bridge.connection_method = None
+        disconnected_services.append("Database")
+        logger.info("Disconnected from Database")
+    
+    message = f"Disconnected from: {', '.join(disconnected_services)}" if disconnected_services else "No active connections to disconnect"
+    logger.info(message)
+    
+    return jsonify({
+        "success": True,
+        "message": message
+    })
+
+def collect_database_debug_info():
+    """Query server, schema and Horus table details for /debug-db"""
+    with bridge.acquire() as conn:
+        with conn.cursor() as cursor:
+            debug_info = {}
+            
+            cursor.execute("SELECT version(), current_database(), current_user")
+            db_info = cursor.fetchone()
+            debug_info['database_info'] = {
+                "version": db_info[0],
+                "database": db_info[1], 
+                "user": db_info[2]
+            }
+            
+            cursor.execute("""
+                SELECT table_name, table_type
+                FROM information_schema.tables 
+                WHERE table_schema = 'public'
+                ORDER BY table_name
+            """)
+            tables = cursor.fetchall()
+            debug_info['tables'] = [{"name": t[0], "type": t[1]} for t in tables]
+            
+            horus_tables_info = {}
+            for table_name in ['recordings', 'frames']:
+                try:
+                    # Planner estimate from the catalog; COUNT(*) would scan the whole frames table
+                    cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", (table_name,))
+                    row = cursor.fetchone()
+                    if row is None:
+                        horus_tables_info[table_name] = {"exists": False, "error": f'relation "{table_name}" does not exist'}
+                        continue
+                    
+                    # reltuples is -1 until the table has been analyzed
+                    estimate = row[0]
+                    horus_tables_info[table_name] = {"exists": True, "count": max(estimate, 0), "count_is_estimate": True}
+                    
+                    if estimate != 0:
+                        cursor.execute(sql.SQL("SELECT * FROM {} LIMIT 3").format(sql.Identifier(table_name)))
+                        sample_data = cursor.fetchall()
+                        # Column names come with the sample rows, no information_schema round trip needed
+                        columns = [col.name for col in cursor.description]
+                        horus_tables_info[table_name]["columns"] = columns
+                        horus_tables_info[table_name]["sample_rows"] = len(sample_data)
+                        
+                except psycopg2.Error as e:
+                    horus_tables_info[table_name] = {"exists": False, "error": str(e)}
+            
+            # Sequential scans next to per-index scans; a lookup without a usable index shows
+            # up as a seq_scan count that keeps climbing
+            try:
+                cursor.execute(TABLE_SCAN_STATS_QUERY, (list(horus_tables_info),))
+                for table_name, seq_scan, index_name, idx_scan in cursor.fetchall():
+                    table_info = horus_tables_info[table_name]
+                    table_info["seq_scan"] = seq_scan
+                    table_info.setdefault("index_scans", {})
+                    if index_name:
+                        table_info["index_scans"][index_name] = idx_scan
+            except psycopg2.Error as e:
+                debug_info['scan_stats_error'] = str(e)
+            
+            debug_info['horus_tables'] = horus_tables_info
+    
+    return debug_info
 
 @app.route('/debug-db', methods=['GET'])
+@json_errors("Database debug failed")
 def debug_database():
     """Debug endpoint with comprehensive database diagnostics"""
-    try:
-        if not bridge.db_connection:
-            return jsonify({
-                "success": False,
-                "error": "Not connected to database",
-                "suggestion": "Use /connect or /test-db to establish connection first"
-            }), 400
-        
-        cursor = bridge.db_connection.cursor()
-        debug_info = {}
-        
-        cursor.execute("SELECT version(), current_database(), current_user")
-        db_info = cursor.fetchone()
-        debug_info['database_info'] = {
-            "version": db_info[0],
-            "database": db_info[1], 
-            "user": db_info[2]
-        }
-        
-        cursor.execute("""
-            SELECT table_name, table_type
-            FROM information_schema.tables 
-            WHERE table_schema = 'public'
-            ORDER BY table_name
-        """)
-        tables = cursor.fetchall()
-        debug_info['tables'] = [{"name": t[0], "type": t[1]} for t in tables]
-        
-        horus_tables_info = {}
-        for table_name in ['recordings', 'frames']:
-            try:
-                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                count = cursor.fetchone()[0]
-                horus_tables_info[table_name] = {"exists": True, "count": count}
-                
-                if count > 0:
-                    cursor.execute(f"SELECT * FROM {table_name} LIMIT 3")
-                    sample_data = cursor.fetchall()
-                    cursor.execute(f"SELECT column_name FROM information_schema.columns WHERE table_name = '{table_name}'")
-                    columns = [col[0] for col in cursor.fetchall()]
-                    horus_tables_info[table_name]["columns"] = columns
-                    horus_tables_info[table_name]["sample_rows"] = len(sample_data)
-                    
-            except psycopg2.Error as e:
-                horus_tables_info[table_name] = {"exists": False, "error": str(e)}
-        
-        debug_info['horus_tables'] = horus_tables_info
-        
-        cursor.close()
-        
-        return jsonify({
-            "success": True,
-            "connection_method": bridge.connection_method,
-            "database_debug": debug_info
-        })
-        
-    except Exception as e:
-        logger.error(f"Database debug failed: {e}")
+    if not bridge.db_pool:
         return jsonify({
             "success": False,
-            "error": str(e)
-        }), 500
+            "error": "Not connected to database",
+            "suggestion": "Use /connect or /test-db to establish connection first"
+        }), 400
+    
+    # The schema barely changes, so a polling client is served from memory; ?refresh=1 forces a query
+    cached = bridge._debug_db_cache
+    if cached and cached[0] > time.monotonic() and not request.args.get('refresh'):
+        debug_info = cached[1]
+    else:
+        debug_info = collect_database_debug_info()
+        bridge._debug_db_cache = (time.monotonic() + DEBUG_DB_CACHE_TTL, debug_info)
+    
+    return jsonify({
+        "success": True,
+        "connection_method": bridge.connection_method,
+        "database_debug": debug_info
+    })
+
+# Serialized once at import instead of on every hit
+NOT_FOUND_BODY = app.json.dumps({
+    "success": False,
+    "error": "Endpoint not found",
+    "available_endpoints": [
+        "GET /health - Health check & diagnostics",
+        "GET /ready - Lightweight readiness probe",
+        "POST /connect - Connect to services with full diagnostics", 
+        "POST /test-db - Test database connection",
+        "POST /network-test - Test network connectivity",
+        "GET /debug-db - Debug database content",
+        "GET /recordings - Get recordings list",
+        "POST /images - Get images from recording",
+        "POST /images/stream - Stream raw JPEG images (multipart/mixed)",
+        "GET /image/<recording>/<timestamp> - Get JPEG nearest a timestamp (?format=json for base64)",
+        "POST /disconnect - Disconnect from services"
+    ]
+})
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
-        "success": False,
-        "error": "Endpoint not found",
-        "available_endpoints": [
-            "GET /health - Health check & diagnostics",
-            "POST /connect - Connect to services with full diagnostics", 
-            "POST /test-db - Test database connection",
-            "POST /network-test - Test network connectivity",
-            "GET /debug-db - Debug database content",
-            "GET /recordings - Get recordings list",
-            "POST /images - Get images from recording",
-            "POST /disconnect - Disconnect from services"
-        ]
-    }), 404
+    return Response(NOT_FOUND_BODY, status=404, mimetype="application/json")
 
 @app.errorhandler(500)
 def internal_error(error):
@@ -1391,6 +2095,8 @@ def parse_arguments():
     parser.add_argument('--port', type=int, default=5001, help='Server port (default: 5001)')
     parser.add_argument('--host', default='localhost', help='Server host (default: localhost)')
     parser.add_argument('--debug-network', action='store_true', help='Run network diagnostics on startup')
+    parser.add_argument('--threads', type=int, default=16, help='Worker threads when served by waitress (default: 16)')
+    parser.add_argument('--flask-debug', action='store_true', help='Enable the Flask debugger when falling back to the development server')
     return parser.parse_args()
 
 def startup_network_diagnostics():
@@ -1423,17 +2129,16 @@ def check_dependencies():
     required_packages = {
         'flask': 'Flask',
         'psycopg2': 'psycopg2-binary', 
-        'PIL': 'Pillow',
-        'socket': 'Built-in'
+        'PIL': 'Pillow'
     }
     
     missing_packages = []
     
+    # find_spec only locates each package, it doesn't run its import
     for package, install_name in required_packages.items():
-        try:
-            __import__(package)
+        if importlib.util.find_spec(package) is not None:
             print(f"{package}: Available")
-        except ImportError:
+        else:
             missing_packages.append(install_name)
             print(f"{package}: Missing")
     
@@ -1484,24 +2189,43 @@ if __name__ == '__main__':
     print("")
     print("Enhanced endpoints:")
     print("  GET  /health                 - Health check & diagnostics")
+    print("  GET  /ready                  - Lightweight readiness probe")
     print("  POST /connect                - Connect with full diagnostics")
     print("  POST /test-db                - Test database connection")
     print("  POST /network-test           - Test network connectivity")
     print("  GET  /debug-db               - Debug database content")
     print("  GET  /recordings             - Get recordings list")
     print("  POST /images                 - Get images from recording")
+    print("  POST /images/stream          - Stream raw JPEG images (multipart)")
+    print("  GET  /image/<rec>/<time>     - Get JPEG nearest a timestamp")
     print("  POST /disconnect             - Disconnect from services")
     print("=" * 60)
     print("")
     
     try:
-        app.run(
-            host=args.host,
-            port=args.port,
-            debug=True,
-            threaded=True,
-            use_reloader=False
-        )
+        if WAITRESS_AVAILABLE:
+            # Requests mostly wait on the database and Horus server, so a pool of
+            # worker threads keeps slow calls from holding up the rest. waitress reads
+            # each request body in full before a worker picks it up, so a slow client
+            # only ties up its own channel; the size cap bounds that buffer
+            print(f"Serving with waitress ({args.threads} threads)")
+            bridge.db_pool_max = max(args.threads, 2)
+            serve(
+                app,
+                host=args.host,
+                port=args.port,
+                threads=args.threads,
+                max_request_body_size=MAX_REQUEST_BODY_SIZE
+            )
+        else:
+            print("waitress not installed, using the Flask development server")
+            app.run(
+                host=args.host,
+                port=args.port,
+                debug=args.flask_debug,
+                threaded=True,
+                use_reloader=False
+            )
     except KeyboardInterrupt:
         print("\nServer stopped by user")
     except Exception as e:
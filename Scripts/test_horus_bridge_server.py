@@ -0,0 +1,59 @@
+"""
+Tests for horus_bridge_server
+Database tests need a scratch PostgreSQL given by HORUS_TEST_DSN, e.g.
+HORUS_TEST_DSN="host=localhost dbname=postgres user=postgres" python -m unittest test_horus_bridge_server
+"""
+
+import os
+import unittest
+from datetime import datetime
+
+import psycopg2
+
+import horus_bridge_server
+
+TEST_DSN = os.environ.get("HORUS_TEST_DSN")
+
+@unittest.skipUnless(TEST_DSN, "HORUS_TEST_DSN not set")
+class NearestFrameQueryTests(unittest.TestCase):
+    """NEAREST_FRAME_QUERY picks the closest frame for naive and zone-qualified targets"""
+
+    FRAME_TIMES = ["2024-01-01 12:00:00", "2024-01-01 12:00:10", "2024-01-01 12:00:20"]
+
+    def setUp(self):
+        self.conn = psycopg2.connect(TEST_DSN)
+        self.addCleanup(self.conn.close)
+        with self.conn.cursor() as cursor:
+            # Every test runs against UTC so zone-qualified targets have a known offset
+            cursor.execute("SET TIME ZONE 'UTC'")
+
+    def nearest_index(self, column_type, target):
+        """Run the query against a temporary frames table whose timestamp has column_type"""
+        with self.conn.cursor() as cursor:
+            # pg_temp comes first in the search path, so this shadows any real frames table
+            cursor.execute(f'CREATE TEMP TABLE frames (recordingid int, "index" int, timestamp {column_type})')
+            cursor.executemany(
+                "INSERT INTO frames VALUES (1, %s, %s)",
+                list(enumerate(self.FRAME_TIMES))
+            )
+            cursor.execute(horus_bridge_server.NEAREST_FRAME_QUERY, {"recording_id": 1, "target": target})
+            candidates = cursor.fetchall()
+        self.conn.rollback()
+        return min(candidates, key=lambda row: row[2])[0]
+
+    def test_naive_target(self):
+        target = datetime.fromisoformat("2024-01-01T12:00:12")
+        for column_type in ("timestamp", "timestamptz"):
+            with self.subTest(column_type=column_type):
+                self.assertEqual(self.nearest_index(column_type, target), 1)
+
+    def test_zone_qualified_target(self):
+        # 13:00:18+01:00 is 12:00:18 UTC
+        for timestamp in ("2024-01-01T12:00:18Z", "2024-01-01T13:00:18+01:00"):
+            target = datetime.fromisoformat(timestamp)
+            for column_type in ("timestamp", "timestamptz"):
+                with self.subTest(timestamp=timestamp, column_type=column_type):
+                    self.assertEqual(self.nearest_index(column_type, target), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 ﻿using System;
 using System.Collections.Generic;
+using System.Net;
 using System.Net.Http;
 using System.Text;
 using System.Threading.Tasks;
@@ -17,7 +18,11 @@ namespace Test.Services
 
         public HorusMediaService()
         {
-            _httpClient = new HttpClient();
+            // Lets the bridge gzip/brotli-compress its JSON responses
+            _httpClient = new HttpClient(new HttpClientHandler
+            {
+                AutomaticDecompression = DecompressionMethods.GZip | DecompressionMethods.Brotli
+            });
             _httpClient.Timeout = TimeSpan.FromMinutes(5);
             _httpClient.DefaultRequestHeaders.Add("User-Agent", "SphericalImageViewer-HorusBridge/1.0");
         }
@@ -231,7 +236,7 @@ namespace Test.Services
 
             try
             {
-                var url = $"{_bridgeUrl}/image/{Uri.EscapeDataString(recordingEndpoint)}/{Uri.EscapeDataString(timestamp)}?width={width}&height={height}";
+                var url = $"{_bridgeUrl}/image/{Uri.EscapeDataString(recordingEndpoint)}/{Uri.EscapeDataString(timestamp)}?width={width}&height={height}&format=json";
 
                 var response = await _httpClient.GetAsync(url);
                 var content = await response.Content.ReadAsStringAsync();